@@ -1,17 +1,21 @@
 import os, requests, json, time
 from dotenv import load_dotenv
+from bear.events import slim_order
 load_dotenv()
 
 class AlpacaPaper:
-    def __init__(self):
+    def __init__(self, recorder=None, base=None, data_base=None):
         self.key    = os.getenv('ALPACA_API_KEY')
         self.secret = os.getenv('ALPACA_API_SECRET')
-        self.base   = 'https://paper-api.alpaca.markets'
+        self.base   = base or 'https://paper-api.alpaca.markets'
+        self.data_base = data_base or 'https://data.alpaca.markets'
         self.session = requests.Session()
         self.session.headers.update({
             'APCA-API-KEY-ID':  self.key,
             'APCA-API-SECRET-KEY': self.secret
         })
+        self.recorder = recorder  # Optional EventRecorder for replay
+        self.last_response_ns = time.time_ns()
 
     # --------- helpers ----------
     def _norm(self, symbol):
@@ -20,58 +24,155 @@ class AlpacaPaper:
             return f"{symbol[:3]}/{symbol[3:]}"
         return symbol  # already formatted
 
+    def _record(self, kind, method, args, payload):
+        if self.recorder is not None:
+            self.recorder.record(kind, method, args, payload, self.last_response_ns)
+
+    def clock(self):
+        """Time of the last broker response (seconds), the same stamp the event log gets"""
+        return self.last_response_ns / 1e9
+
+    def _request(self, verb, url, call=None, **kwargs):
+        """
+        Send a request and return the decoded JSON
+
+        Args:
+            call: (method, args) to log an 'error' event under if the request fails
+        """
+        try:
+            r = self.session.request(verb, url, **kwargs)
+            self.last_response_ns = time.time_ns()
+            r.raise_for_status()
+            return r.json() if r.content else {}  # DELETE answers 204 No Content
+        except Exception as e:
+            if call is not None:
+                self._record('error', call[0], call[1], str(e))
+            raise
+
     # --------- price ------------
     def get_price(self, symbol):
         # Alpaca crypto uses data API, not paper-api
-        url = f"https://data.alpaca.markets/v1beta3/crypto/us/latest/quotes"
+        url = f"{self.data_base}/v1beta3/crypto/us/latest/quotes"
         params = {"symbols": self._norm(symbol)}
-        r = self.session.get(url, params=params)
-        r.raise_for_status()
-        data = r.json()
+        data = self._request('GET', url, call=('get_price', [symbol]), params=params)
         symbol_key = self._norm(symbol)
-        return float(data['quotes'][symbol_key]['bp'])   # bid price
+        price = float(data['quotes'][symbol_key]['bp'])   # bid price
+        self._record('quote', 'get_price', [symbol], price)
+        return price
+
+    def get_quote(self, symbol):
+        """Full top of book: {'bid', 'ask', 'bid_size', 'ask_size', 't'}"""
+        url = f"{self.data_base}/v1beta3/crypto/us/latest/quotes"
+        params = {"symbols": self._norm(symbol)}
+        data = self._request('GET', url, call=('get_quote', [symbol]), params=params)
+        q = data['quotes'][self._norm(symbol)]
+        quote = {
+            'bid': float(q['bp']), 'ask': float(q['ap']),
+            'bid_size': float(q['bs']), 'ask_size': float(q['as']),
+            't': q.get('t')
+        }
+        self._record('quote', 'get_quote', [symbol], quote)
+        return quote
+
+    def get_orderbook(self, symbol, depth=50):
+        """
+        Latest orderbook snapshot, best levels first
+
+        Returns:
+            {'b': [[price, size], ...], 'a': [[price, size], ...], 't': timestamp}
+        """
+        url = f"{self.data_base}/v1beta3/crypto/us/latest/orderbooks"
+        params = {"symbols": self._norm(symbol)}
+        data = self._request('GET', url, call=('get_orderbook', [symbol, depth]), params=params)
+        book = data['orderbooks'][self._norm(symbol)]
+        bids = sorted(((float(l['p']), float(l['s'])) for l in book['b']), reverse=True)[:depth]
+        asks = sorted((float(l['p']), float(l['s'])) for l in book['a'])[:depth]
+        snapshot = {
+            'b': [list(l) for l in bids],
+            'a': [list(l) for l in asks],
+            't': book.get('t')
+        }
+        self._record('book', 'get_orderbook', [symbol, depth], snapshot)
+        return snapshot
+
+    # --------- history ----------
+    def get_bars(self, symbol, start, end, timeframe='1Min', page_token=None, limit=10000):
+        """
+        One page of historical bars
+
+        Returns:
+            (bars, next_page_token): bars as Alpaca dicts {'t','o','h','l','c','v','n','vw'}
+        """
+        url = f"{self.data_base}/v1beta3/crypto/us/bars"
+        params = {"symbols": self._norm(symbol), "start": start, "end": end,
+                  "timeframe": timeframe, "limit": limit, "sort": "asc"}
+        if page_token:
+            params["page_token"] = page_token
+        data = self._request('GET', url, params=params)
+        return data['bars'].get(self._norm(symbol), []), data.get('next_page_token')
+
+    def get_trades(self, symbol, start, end, page_token=None, limit=10000):
+        """
+        One page of historical trades
+
+        Returns:
+            (trades, next_page_token): trades as Alpaca dicts {'t','p','s','tks','i'}
+        """
+        url = f"{self.data_base}/v1beta3/crypto/us/trades"
+        params = {"symbols": self._norm(symbol), "start": start, "end": end,
+                  "limit": limit, "sort": "asc"}
+        if page_token:
+            params["page_token"] = page_token
+        data = self._request('GET', url, params=params)
+        return data['trades'].get(self._norm(symbol), []), data.get('next_page_token')
 
     # --------- balance ----------
     def get_balance(self):
         url = f"{self.base}/v2/account"
-        r = self.session.get(url)
-        r.raise_for_status()
-        return float(r.json()['cash'])
+        cash = float(self._request('GET', url, call=('get_balance', []))['cash'])
+        self._record('balance', 'get_balance', [], cash)
+        return cash
 
     # --------- orders -----------
     def buy(self, symbol, qty, price):
-        url = f"{self.base}/v2/orders"
-        data = {
-            "symbol":      self._norm(symbol),
-            "qty":         str(qty),
-            "side":        "buy",
-            "type":        "limit",
-            "limit_price": str(price),
-            "time_in_force": "gtc"
-        }
-        r = self.session.post(url, json=data)
-        r.raise_for_status()
-        return r.json()
+        return self._limit_order('buy', symbol, qty, price)
 
     def sell(self, symbol, qty, price):
+        return self._limit_order('sell', symbol, qty, price)
+
+    def _limit_order(self, side, symbol, qty, price):
         url = f"{self.base}/v2/orders"
         data = {
             "symbol":      self._norm(symbol),
             "qty":         str(qty),
-            "side":        "sell",
+            "side":        side,
             "type":        "limit",
             "limit_price": str(price),
             "time_in_force": "gtc"
         }
-        r = self.session.post(url, json=data)
-        r.raise_for_status()
-        return r.json()
+        call = (side, [symbol, qty, price])
+        order = self._request('POST', url, call=call, json=data)
+        self._record('ack', side, call[1], slim_order(order))
+        return order
 
     # --------- order management -----------
-    def get_orders(self, status='open', limit=500):
-        """Get orders by status"""
+    def get_orders(self, status='open', limit=500, after=None, until=None, direction='desc',
+                   symbols=None):
+        """
+        Get orders by status
+
+        after/until (ISO timestamps on submitted_at) page through history;
+        the API has no page token, so callers advance `after` themselves.
+        symbols: comma-separated pairs to filter on (e.g. 'BTCUSD,ETHUSD')
+        """
         url = f"{self.base}/v2/orders"
-        params = {'status': status, 'limit': limit}
+        params = {'status': status, 'limit': limit, 'direction': direction}
+        if symbols:
+            params['symbols'] = ','.join(self._norm(s) for s in symbols.split(','))
+        if after:
+            params['after'] = after
+        if until:
+            params['until'] = until
         r = self.session.get(url, params=params)
         r.raise_for_status()
         return r.json()
@@ -79,20 +180,21 @@ class AlpacaPaper:
     def get_order(self, order_id):
         """Get single order by ID"""
         url = f"{self.base}/v2/orders/{order_id}"
-        r = self.session.get(url)
-        r.raise_for_status()
-        return r.json()
+        order = self._request('GET', url, call=('get_order', [order_id]))
+        kind = 'fill' if order.get('status') == 'filled' else 'order'
+        self._record(kind, 'get_order', [order_id], slim_order(order))
+        return order
 
     def cancel_order(self, order_id):
         """Cancel a specific order"""
         url = f"{self.base}/v2/orders/{order_id}"
-        r = self.session.delete(url)
-        r.raise_for_status()
-        return r.json()
+        result = self._request('DELETE', url, call=('cancel_order', [order_id]))
+        self._record('cancel', 'cancel_order', [order_id], None)
+        return result
 
     def cancel_all_orders(self):
         """Cancel all open orders"""
         url = f"{self.base}/v2/orders"
         r = self.session.delete(url)
         r.raise_for_status()
-        return r.json()
\ No newline at end of file
+        return r.json()
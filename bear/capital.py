@@ -0,0 +1,125 @@
+import itertools
+import threading
+
+
+class CapitalLedger:
+    """
+    Local cash accounting shared by every grid in one account
+
+    Each resting buy reserves its notional up front and releases it on
+    cancel or fill, so sizing and placement decisions never need a broker
+    round-trip. Cash is re-synced from the broker only every sync_every
+    seconds.
+    """
+
+    def __init__(self, weights: dict, allocation: str = 'weight', sync_every: float = 300):
+        """
+        Args:
+            weights: {pair: weight} for every pair trading in the account
+            allocation: 'weight' (fixed shares) or 'performance' (tilt toward profitable pairs)
+            sync_every: Seconds between broker cash syncs
+        """
+        self.weights = dict(weights)
+        self.allocation = allocation
+        self.sync_every = sync_every
+
+        self.cash = 0.0          # Broker cash at last sync, adjusted locally since
+        self.reservations = {}   # {token: (pair, amount)}
+        self.filled = {}         # {token: notional already filled} for partially filled buys
+        self.reserved = {pair: 0.0 for pair in weights}
+        self.profit = {pair: 0.0 for pair in weights}
+        self._tokens = itertools.count(1)
+        self._next_sync = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config: dict, pairs: list = None):
+        """Ledger covering pairs (default: `pairs`, else `pair`) with capital.* settings"""
+        capital = config.get('capital', {})
+        pairs = pairs or config.get('pairs') or [config['pair']]
+        weights = capital.get('weights') or {}
+        return cls(
+            {pair: weights.get(pair, 1.0) for pair in pairs},
+            allocation=capital.get('allocation', 'weight'),
+            sync_every=capital.get('sync_every', 300)
+        )
+
+    # --------- broker sync ----------
+    def maybe_sync(self, api, now: float) -> bool:
+        """Refresh cash from the broker if the last sync is older than sync_every"""
+        if self._next_sync is not None and now < self._next_sync:
+            return False
+        cash = api.get_balance()
+        with self._lock:
+            # Broker cash still holds the unfilled part of our open buys, not the filled part
+            self.cash = cash - sum(self.reserved.values()) + sum(self.filled.values())
+            self._next_sync = now + self.sync_every
+        return True
+
+    # --------- allocation ----------
+    def _weight(self, pair: str) -> float:
+        weight = self.weights.get(pair, 0.0)
+        if self.allocation == 'performance' and self.cash > 0:
+            # Realized P&L relative to an equal share tilts the weight, within 0.5x..2x
+            base = self.cash / max(len(self.weights), 1)
+            weight *= min(max(1 + self.profit[pair] / base, 0.5), 2.0)
+        return weight
+
+    def budget(self, pair: str) -> float:
+        """Cash this pair may commit (reserved + spendable), from the last sync"""
+        total = sum(self._weight(p) for p in self.weights)
+        if total <= 0:
+            return 0.0
+        return (self.cash + sum(self.reserved.values())) * self._weight(pair) / total
+
+    def available(self, pair: str) -> float:
+        """Unreserved part of the pair's budget"""
+        return max(0.0, min(self.budget(pair) - self.reserved[pair], self.cash))
+
+    # --------- reservations ----------
+    def reserve(self, pair: str, amount: float):
+        """
+        Hold cash for a buy order before it is sent
+
+        Returns:
+            Reservation token, or None if the pair's budget or account cash is short
+        """
+        with self._lock:
+            if amount > self.available(pair):
+                return None
+            token = next(self._tokens)
+            self.reservations[token] = (pair, amount)
+            self.reserved[pair] += amount
+            self.cash -= amount
+            return token
+
+    def partial_fill(self, token, notional: float):
+        """Record how much of a buy has filled so far (cumulative notional, until spend/release)"""
+        with self._lock:
+            if token in self.reservations:
+                self.filled[token] = notional
+
+    def release(self, token):
+        """Give back a reservation (order cancelled, rejected or never placed)"""
+        with self._lock:
+            if token not in self.reservations:
+                return
+            pair, amount = self.reservations.pop(token)
+            self.reserved[pair] -= amount
+            self.cash += amount - self.filled.pop(token, 0.0)  # What did fill stays spent
+
+    def spend(self, token, notional: float):
+        """Buy filled: the reservation is consumed, any price improvement comes back"""
+        with self._lock:
+            if token in self.reservations:
+                pair, amount = self.reservations.pop(token)
+                self.reserved[pair] -= amount
+                self.cash += amount
+                self.filled.pop(token, None)
+            self.cash -= notional
+
+    def credit(self, pair: str, notional: float, profit: float = 0.0):
+        """Sell filled: proceeds return to cash, profit feeds performance allocation"""
+        with self._lock:
+            self.cash += notional
+            self.profit[pair] = self.profit.get(pair, 0.0) + profit
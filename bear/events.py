@@ -0,0 +1,65 @@
+import time
+import msgpack
+from pathlib import Path
+
+# Only the order fields the bot actually reads are kept, so the log stays compact
+ORDER_FIELDS = ('id', 'status', 'side', 'qty', 'limit_price',
+                'filled_qty', 'filled_avg_price', 'created_at', 'filled_at')
+
+
+def slim_order(order: dict) -> dict:
+    """Strip an Alpaca order response down to ORDER_FIELDS"""
+    return {k: order.get(k) for k in ORDER_FIELDS}
+
+
+class ReplayDivergence(Exception):
+    """Raised when a replayed bot asks for something the recorded session did not"""
+
+
+class RecordedError(Exception):
+    """Re-raised during replay where the live session hit an API error"""
+
+
+class EventRecorder:
+    """
+    Append-only binary log of every inbound event the bot sees
+
+    Each event is one msgpack array: [kind, wall_ns, method, args, payload]
+        kind:    'quote', 'book', 'balance', 'ack', 'order', 'fill', 'cancel' or 'error'
+        method:  AlpacaPaper method that produced it
+        args:    call arguments (used to verify replay stays on the same path)
+        payload: response data (price, order dict, error text)
+    """
+
+    def __init__(self, path):
+        """
+        Args:
+            path: Log file (appended to, parent directory auto-created)
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, 'ab')
+        self._packer = msgpack.Packer()
+        self.count = 0
+
+    def record(self, kind: str, method: str, args: list, payload, ts_ns: int = None):
+        """Write one event and flush so a crash never loses what the bot saw"""
+        ts_ns = ts_ns if ts_ns is not None else time.time_ns()
+        self._file.write(self._packer.pack([kind, ts_ns, method, args, payload]))
+        self._file.flush()
+        self.count += 1
+
+    def close(self):
+        self._file.close()
+
+
+def read_events(path) -> list:
+    """
+    Load a recorded event log
+
+    Returns:
+        [(kind, wall_ns, method, args, payload), ...] in recording order
+    """
+    with open(path, 'rb') as f:
+        unpacker = msgpack.Unpacker(f, raw=False, strict_map_key=False)
+        return [tuple(event) for event in unpacker]
@@ -0,0 +1,225 @@
+import itertools
+import logging
+import math
+import time
+
+
+class ParentOrder:
+    """One logical grid order split into child orders"""
+
+    __slots__ = ('id', 'side', 'symbol', 'qty', 'price', 'pending', 'live',
+                 'filled_qty', 'filled_notional', 'partial', 'last_release', 'canceled',
+                 'failures', 'abandoned')
+
+    def __init__(self, order_id: str, side: str, symbol: str, qty: float, price: float, children: list):
+        self.id = order_id
+        self.side = side
+        self.symbol = symbol
+        self.qty = qty
+        self.price = price
+        self.pending = children      # Child quantities not yet sent
+        self.live = {}               # {child_id: child qty} resting at the broker
+        self.filled_qty = 0.0        # From children that are done
+        self.filled_notional = 0.0
+        self.partial = {}            # {child_id: (qty, notional)} filled so far on live children
+        self.last_release = None
+        self.canceled = False
+        self.failures = 0            # Failed sends + children that died unfilled
+        self.abandoned = None        # 'rejected' / 'canceled' once we stop retrying
+
+
+class SlicedExecutor:
+    """
+    Execution layer that slices large limit orders into child orders
+
+    Sits between GridTradingBot and the broker client with the same
+    interface. Orders above max_child_notional become one ParentOrder: at
+    most `visible` children rest at once (iceberg), and a new child goes
+    out only `interval` seconds after the previous one (TWAP). The bot sees
+    and tracks only the parent id; get_order() reports the parent with
+    child fills aggregated. Every other method passes straight through.
+
+    A rejected child is never re-sent. A canceled or expired child's
+    unfilled rest is re-queued, and a failed send is retried next poll,
+    both at most max_retries times per parent. After that the parent stops
+    and reports a terminal status, so the bot drops it and frees its cash.
+
+    Like a broker order, a cancelled parent can still be read once with
+    get_order(), which reports 'canceled' with whatever did fill.
+    """
+
+    def __init__(self, api, max_child_notional: float = 500, visible: int = 1, interval: float = 0,
+                 max_retries: int = 3):
+        """
+        Args:
+            api: AlpacaPaper-compatible client
+            max_child_notional: Largest child order in dollars
+            visible: Children resting at the broker at once
+            interval: Minimum seconds between child releases (0 = release as soon as one fills)
+            max_retries: Re-sends allowed per parent before it is given up
+        """
+        self.api = api
+        self.max_child_notional = max_child_notional
+        self.visible = visible
+        self.interval = interval
+        self.max_retries = max_retries
+        self.parents = {}
+        self._ids = itertools.count(1)
+        self.clock = getattr(api, 'clock', time.time)
+        self.logger = logging.getLogger('Execution')
+
+    def __getattr__(self, name):
+        # get_price, get_balance, get_orderbook, ... go straight to the broker
+        if name == 'api':
+            raise AttributeError(name)
+        return getattr(self.api, name)
+
+    # --------- orders ----------
+    def buy(self, symbol, qty, price):
+        return self._submit('buy', symbol, qty, price)
+
+    def sell(self, symbol, qty, price):
+        return self._submit('sell', symbol, qty, price)
+
+    def _submit(self, side, symbol, qty, price):
+        n = math.ceil(qty * price / self.max_child_notional)
+        if n <= 1:
+            return self._send(side, symbol, qty, price)
+
+        child = round(qty / n, 6)
+        children = [child] * (n - 1) + [round(qty - child * (n - 1), 6)]
+        parent = ParentOrder(f"slice-{next(self._ids)}", side, symbol, qty, price, children)
+
+        # First child goes out now so placement errors surface to the caller; once
+        # one child is resting, later send errors are retried like any other
+        self._release(parent, raise_errors=True)
+        self.parents[parent.id] = parent
+        self.logger.info(f"Sliced {side} {qty} @ ${price:,.2f} into {n} children ({parent.id})")
+        return self._report(parent)
+
+    def _send(self, side, symbol, qty, price):
+        if side == 'buy':
+            return self.api.buy(symbol, qty, price)
+        return self.api.sell(symbol, qty, price)
+
+    def _release(self, parent: ParentOrder, raise_errors: bool = False):
+        """Send pending children while visibility and TWAP spacing allow"""
+        while parent.pending and len(parent.live) < self.visible:
+            now = self.clock()
+            if parent.last_release is not None and now - parent.last_release < self.interval:
+                return
+            qty = parent.pending[0]
+            try:
+                response = self._send(parent.side, parent.symbol, qty, parent.price)
+            except Exception as e:
+                if raise_errors and not parent.live:
+                    raise
+                self.logger.error(f"Child order for {parent.id} failed: {e}")
+                self._failed(parent, 'rejected')
+                return
+            parent.pending.pop(0)
+            parent.live[response['id']] = qty
+            parent.last_release = now
+
+    def get_order(self, order_id):
+        parent = self.parents.get(order_id)
+        if parent is None:
+            return self.api.get_order(order_id)
+
+        for child_id, child_qty in list(parent.live.items()):
+            child = self.api.get_order(child_id)
+            status = child['status']
+            filled = self._book(parent, child_id, child)
+            if status not in ('filled', 'canceled', 'expired', 'rejected'):
+                continue
+
+            del parent.live[child_id]
+            if status == 'rejected':
+                # The broker refused this size/price; re-sending it would only be refused again
+                self.logger.error(f"Child {child_id} of {parent.id} rejected, giving up on the rest")
+                parent.pending = []
+                parent.abandoned = 'rejected'
+            elif status != 'filled' and child_qty - filled > 1e-9:
+                parent.pending.insert(0, round(child_qty - filled, 6))  # Re-send the unfilled rest
+                self._failed(parent, 'canceled')
+
+        if not parent.canceled:
+            self._release(parent)
+
+        report = self._report(parent)
+        if report['status'] in ('filled', 'canceled', 'rejected'):
+            del self.parents[order_id]
+        return report
+
+    def _book(self, parent: ParentOrder, child_id: str, child: dict) -> float:
+        """Take in a child's cumulative fill; once it is done, move it to the parent totals"""
+        filled = float(child.get('filled_qty') or 0)
+        notional = filled * float(child['filled_avg_price']) if filled else 0.0
+        if child['status'] in ('filled', 'canceled', 'expired', 'rejected'):
+            parent.partial.pop(child_id, None)
+            parent.filled_qty += filled
+            parent.filled_notional += notional
+        elif filled:
+            parent.partial[child_id] = (filled, notional)
+        return filled
+
+    @staticmethod
+    def _filled(parent: ParentOrder):
+        """(qty, notional) filled across done and live children"""
+        qty = parent.filled_qty + sum(q for q, _ in parent.partial.values())
+        notional = parent.filled_notional + sum(n for _, n in parent.partial.values())
+        return qty, notional
+
+    def _failed(self, parent: ParentOrder, status: str):
+        """Count a failed attempt and stop sending once max_retries is used up"""
+        parent.failures += 1
+        if parent.failures > self.max_retries:
+            self.logger.error(f"{parent.id} failed {parent.failures} times, giving up on the rest")
+            parent.pending = []
+            parent.abandoned = status
+
+    def cancel_order(self, order_id):
+        parent = self.parents.get(order_id)
+        if parent is None:
+            return self.api.cancel_order(order_id)
+
+        filled_qty, _ = self._filled(parent)
+        if filled_qty > 0:
+            # Dropping it would lose the fills from the bot's books; let it complete
+            raise RuntimeError(f"{order_id} is partially filled ({filled_qty}), not cancelling")
+
+        for child_id in list(parent.live):
+            self.api.cancel_order(child_id)
+            # A fill can land between the last poll and the cancel; keep it on the parent
+            self._book(parent, child_id, dict(self.api.get_order(child_id), status='canceled'))
+            del parent.live[child_id]
+        parent.pending = []
+        parent.canceled = True  # Kept until get_order() reports it once
+        return {}
+
+    def _report(self, parent: ParentOrder) -> dict:
+        """Alpaca-shaped order dict for the logical order"""
+        filled_qty, filled_notional = self._filled(parent)
+        if parent.canceled:
+            status = 'canceled'
+        elif not parent.pending and not parent.live:
+            # Given up part way: report what did fill as the fill so the bot books it
+            if parent.abandoned and parent.filled_qty == 0:
+                status = parent.abandoned
+            else:
+                status = 'filled'
+        elif filled_qty > 0:
+            status = 'partially_filled'
+        else:
+            status = 'new'
+        avg = filled_notional / filled_qty if filled_qty else None
+        return {
+            'id': parent.id,
+            'status': status,
+            'side': parent.side,
+            'symbol': parent.symbol,
+            'qty': str(parent.qty),
+            'limit_price': str(parent.price),
+            'filled_qty': str(round(filled_qty, 6)),
+            'filled_avg_price': str(avg) if avg is not None else None
+        }
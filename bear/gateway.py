@@ -0,0 +1,171 @@
+import logging
+import os
+import queue
+import threading
+import time
+from multiprocessing.connection import Listener, Client
+from bear.alpaca_rest import AlpacaPaper
+
+# AlpacaPaper methods strategy workers are allowed to call through the gateway
+GATEWAY_METHODS = ('get_price', 'get_quote', 'get_orderbook', 'get_balance',
+                   'buy', 'sell', 'get_order', 'cancel_order')
+
+
+class GatewayError(Exception):
+    """Broker call failed inside the gateway process"""
+
+
+def gateway_address(shards: dict):
+    """Unix socket path on POSIX, localhost TCP elsewhere"""
+    if os.name == 'posix':
+        return shards.get('socket', '/tmp/cryptobear-gateway.sock')
+    return ('127.0.0.1', shards.get('port', 6010))
+
+
+class RateLimiter:
+    """
+    Token bucket shared by every connection in the gateway
+
+    acquire() blocks until a request may be sent, so the total broker
+    traffic of all workers together stays under one budget.
+    """
+
+    def __init__(self, rate: float, per: float = 60):
+        """
+        Args:
+            rate: Requests allowed per `per` seconds
+            per: Window length (seconds)
+        """
+        self.capacity = rate
+        self.fill_rate = rate / per
+        self.tokens = rate
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.fill_rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.fill_rate
+            time.sleep(wait)
+
+
+class OrderGateway:
+    """
+    The only process that talks to Alpaca in a sharded deployment
+
+    Owns a pool of AlpacaPaper sessions and the global rate limiter, and
+    serves broker calls from strategy workers over a local socket.
+    """
+
+    def __init__(self, address, authkey: bytes, sessions: int = 4,
+                 rate_limit: int = 200, budget: float = 0.5):
+        """
+        Args:
+            address: Unix socket path or (host, port)
+            authkey: Shared secret workers must present
+            sessions: Number of pooled AlpacaPaper HTTP sessions
+            rate_limit: Broker requests per minute
+            budget: Fraction of rate_limit all workers together may use
+        """
+        self.address = address
+        self.authkey = authkey
+        self.limiter = RateLimiter(rate_limit * budget)
+        self.pool = queue.Queue()
+        for _ in range(sessions):
+            self.pool.put(AlpacaPaper())
+        self.logger = logging.getLogger('Gateway')
+
+    def serve_forever(self):
+        if isinstance(self.address, str) and os.path.exists(self.address):
+            os.unlink(self.address)  # Stale socket from a previous run
+
+        with Listener(self.address, authkey=self.authkey) as listener:
+            self.logger.info(f"Order gateway listening on {self.address}")
+            while True:
+                conn = listener.accept()
+                threading.Thread(target=self._serve, args=(conn,), daemon=True).start()
+
+    def _serve(self, conn):
+        """Handle one worker connection: (method, args) in, (ok, result) out"""
+        with conn:
+            while True:
+                try:
+                    method, args = conn.recv()
+                except (EOFError, OSError):
+                    return
+                conn.send(self._call(method, args))
+
+    def _call(self, method: str, args: list):
+        if method not in GATEWAY_METHODS:
+            return (False, f"Unsupported gateway method: {method}")
+
+        self.limiter.acquire()
+        api = self.pool.get()
+        try:
+            return (True, getattr(api, method)(*args))
+        except Exception as e:
+            self.logger.error(f"{method}{tuple(args)} failed: {e}")
+            return (False, str(e))
+        finally:
+            self.pool.put(api)
+
+
+class GatewayClient:
+    """
+    AlpacaPaper-compatible client that forwards every call to the gateway
+
+    Pass it as `api` to GridTradingBot inside a strategy worker.
+    """
+
+    def __init__(self, address, authkey: bytes, connect_timeout: float = 10):
+        deadline = time.monotonic() + connect_timeout
+        while True:
+            try:
+                self.conn = Client(address, authkey=authkey)
+                break
+            except (FileNotFoundError, ConnectionRefusedError):
+                if time.monotonic() > deadline:
+                    raise
+                time.sleep(0.1)  # Gateway still starting
+        self._lock = threading.Lock()
+
+    def _call(self, method: str, *args):
+        with self._lock:
+            self.conn.send((method, list(args)))
+            ok, result = self.conn.recv()
+        if not ok:
+            raise GatewayError(result)
+        return result
+
+    def get_price(self, symbol):
+        return self._call('get_price', symbol)
+
+    def get_quote(self, symbol):
+        return self._call('get_quote', symbol)
+
+    def get_orderbook(self, symbol, depth=50):
+        return self._call('get_orderbook', symbol, depth)
+
+    def get_balance(self):
+        return self._call('get_balance')
+
+    def buy(self, symbol, qty, price):
+        return self._call('buy', symbol, qty, price)
+
+    def sell(self, symbol, qty, price):
+        return self._call('sell', symbol, qty, price)
+
+    def get_order(self, order_id):
+        return self._call('get_order', order_id)
+
+    def cancel_order(self, order_id):
+        return self._call('cancel_order', order_id)
+
+    def close(self):
+        self.conn.close()
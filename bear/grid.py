@@ -3,16 +3,19 @@ class GridCalculator:
     Calculate grid trading levels and position sizes
     """
 
-    def __init__(self, spread: float, count: int, risk_per_trade: float):
+    def __init__(self, spread: float, count: int, risk_per_trade: float, adaptive: dict = None):
         """
         Args:
             spread: Percentage per level (e.g., 0.005 for 0.5%)
             count: Total grid levels (e.g., 10 = 5 buy + 5 sell)
             risk_per_trade: Fraction of balance per order (e.g., 0.02 for 2%)
+            adaptive: Volatility bounds from settings.yaml grid.adaptive (None = static grid)
         """
         self.spread = spread
         self.levels_per_side = count // 2  # 5 for count=10
         self.risk_per_trade = risk_per_trade
+        self.adaptive = adaptive
+        self.coverage = spread * self.levels_per_side  # Price range one side spans
 
     def calculate_grid_levels(self, current_price: float) -> dict:
         """
@@ -63,6 +66,23 @@ class GridCalculator:
         qty = (balance * self.risk_per_trade) / price
         return round(qty, 6)
 
+    def passive_price(self, side: str, price: float, best_bid: float, best_ask: float) -> float:
+        """
+        Pull a limit price back so it rests on the book instead of crossing the spread
+
+        Args:
+            side: 'buy' or 'sell'
+            price: Grid price
+            best_bid: Current best bid
+            best_ask: Current best ask
+
+        Returns:
+            Buy prices capped one cent under the ask, sell prices floored one cent over the bid
+        """
+        if side == 'buy':
+            return min(price, round(best_ask - 0.01, 2))
+        return max(price, round(best_bid + 0.01, 2))
+
     def get_counter_level(self, filled_price: float, side: str, grid_levels: dict) -> float:
         """
         Determine counter-order price for a filled order
@@ -94,3 +114,32 @@ class GridCalculator:
                     return price
             # If no level found, use lowest buy level
             return buy_levels[0][0] if buy_levels else filled_price * (1 - self.spread)
+
+    def adapt(self, atr_pct: float) -> bool:
+        """
+        Resize spacing and level count to the current volatility
+
+        Spacing follows ATR within [min_spread, max_spread]; the level count
+        then changes so one side still spans roughly the configured range,
+        within [min_count, max_count].
+
+        Args:
+            atr_pct: Average true range as a fraction of price
+
+        Returns:
+            True if the grid changed enough to be worth redrawing
+        """
+        a = self.adaptive
+        target = a.get('multiplier', 2.0) * atr_pct
+        target = min(max(target, a.get('min_spread', 0.002)), a.get('max_spread', 0.02))
+
+        # Hysteresis: small changes are not worth the cancels/replaces
+        if abs(target - self.spread) < a.get('tolerance', 0.2) * self.spread:
+            return False
+
+        levels = round(self.coverage / target)
+        levels = min(max(levels, a.get('min_count', 6) // 2), a.get('max_count', 20) // 2)
+
+        self.spread = target
+        self.levels_per_side = levels
+        return True
@@ -0,0 +1,206 @@
+import json
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+
+import pandas as pd
+
+from bear.alpaca_rest import AlpacaPaper
+from bear.gateway import RateLimiter
+
+# Dataset -> column that uniquely identifies a row (used for deduplication)
+DATASETS = {
+    'bars': 't',
+    'trades': 'i',
+    'orders': 'id',
+}
+
+ORDER_PAGE = 500  # Max orders per /v2/orders request
+
+# Order statuses that never change again
+FINAL_ORDER_STATUSES = ('filled', 'canceled', 'expired', 'rejected', 'replaced')
+
+
+class HistoryDownloader:
+    """
+    Bulk historical fetcher with a local Parquet cache
+
+    Data is stored one file per UTC day, hive-partitioned as
+    cache_dir/dataset=bars/symbol=BTCUSD/date=2025-01-31/part.parquet.
+    A `_complete` marker next to it is the checkpoint. It is written only
+    after every page of a day that had already ended (UTC) was stored.
+    A day fetched while still open keeps its data but gets no marker, so
+    later runs refetch it, merge and deduplicate, until it has closed.
+    Orders are long-lived, so an orders day also stays unmarked while any
+    of its orders can still fill or be cancelled. Refetches replace their
+    rows with the latest status.
+    Days are fetched concurrently, and every page request takes a token
+    from one shared rate limiter.
+    """
+
+    def __init__(self, cache_dir, workers: int = 4, rate_limit: int = 200, budget: float = 0.5,
+                 api_factory=AlpacaPaper):
+        """
+        Args:
+            cache_dir: Root of the Parquet cache
+            workers: Days fetched in parallel
+            rate_limit: Broker requests per minute
+            budget: Fraction of rate_limit the downloader may use (leave room for the bot)
+            api_factory: Builds one AlpacaPaper per worker thread (point it at a stand-in server in tests)
+        """
+        self.cache_dir = Path(cache_dir)
+        self.workers = workers
+        self.limiter = RateLimiter(rate_limit * budget)
+        self.api_factory = api_factory
+        self._local = threading.local()
+        self.logger = logging.getLogger('History')
+
+    def _api(self) -> AlpacaPaper:
+        """requests.Session is not thread-safe, so each worker gets its own client"""
+        if not hasattr(self._local, 'api'):
+            self._local.api = self.api_factory()
+        return self._local.api
+
+    # --------- cache layout ----------
+    def partition_path(self, dataset: str, symbol: str, day: date) -> Path:
+        return self.cache_dir / f"dataset={dataset}" / f"symbol={symbol}" / f"date={day:%Y-%m-%d}" / "part.parquet"
+
+    def complete_marker(self, dataset: str, symbol: str, day: date) -> Path:
+        return self.partition_path(dataset, symbol, day).with_name('_complete')
+
+    def today(self) -> date:
+        """Current UTC day (the only day that can still be growing)"""
+        return datetime.now(timezone.utc).date()
+
+    def missing_days(self, dataset: str, symbol: str, start: date, end: date) -> list:
+        """Days in [start, end] without a _complete marker"""
+        days = []
+        day = start
+        while day <= end:
+            if not self.complete_marker(dataset, symbol, day).exists():
+                days.append(day)
+            day += timedelta(days=1)
+        return days
+
+    # --------- download ----------
+    def download(self, dataset: str, symbol: str, start: date, end: date) -> dict:
+        """
+        Fill the cache for [start, end] (inclusive UTC days)
+
+        Args:
+            dataset: 'bars', 'trades' or 'orders' (orders are filtered to symbol)
+            symbol: Pair, e.g. BTCUSD
+
+        Returns:
+            {'days': days fetched, 'rows': rows written, 'failed': [days that errored]}
+        """
+        if dataset not in DATASETS:
+            raise ValueError(f"Unknown dataset {dataset!r}, expected one of {list(DATASETS)}")
+
+        days = self.missing_days(dataset, symbol, start, end)
+        self.logger.info(f"{dataset} {symbol}: {len(days)} day(s) to fetch")
+
+        stats = {'days': 0, 'rows': 0, 'failed': []}
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            futures = {pool.submit(self._fetch_day, dataset, symbol, day): day for day in days}
+            for future in as_completed(futures):
+                day = futures[future]
+                try:
+                    rows = future.result()
+                    stats['days'] += 1
+                    stats['rows'] += rows
+                    self.logger.info(f"{dataset} {symbol} {day}: {rows} rows")
+                except Exception as e:
+                    # Left unwritten, so the next run retries just this day
+                    stats['failed'].append(day)
+                    self.logger.error(f"{dataset} {symbol} {day} failed: {e}")
+        return stats
+
+    def _fetch_day(self, dataset: str, symbol: str, day: date) -> int:
+        # Decided before fetching: a day that closes mid-fetch may be missing its tail
+        closed = day < self.today()
+        start = f"{day:%Y-%m-%d}T00:00:00Z"
+        end = f"{day:%Y-%m-%d}T23:59:59.999999Z"
+        if dataset == 'orders':
+            # `after` is exclusive, so start from the last instant of the previous day
+            rows = self._fetch_orders(symbol, f"{day - timedelta(days=1):%Y-%m-%d}T23:59:59.999999Z", end)
+        else:
+            rows = self._fetch_paged(dataset, symbol, start, end)
+
+        key = DATASETS[dataset]
+        df = pd.DataFrame(rows) if rows else pd.DataFrame({key: pd.Series(dtype='object')})
+        path = self.partition_path(dataset, symbol, day)
+        if path.exists():
+            # Day fetched earlier while still open: merge with what that run stored
+            df = pd.concat([pd.read_parquet(path), df], ignore_index=True)
+        df = df.drop_duplicates(subset=key, keep='last').sort_values(key, ignore_index=True)
+        if dataset == 'orders' and len(df) and not df['status'].isin(FINAL_ORDER_STATUSES).all():
+            closed = False  # Resting orders will still change; refetch until they are done
+
+        # Write-then-rename, then mark complete, so a crash never leaves a half day that looks done
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix('.tmp')
+        df.to_parquet(tmp, index=False)
+        os.replace(tmp, path)
+        if closed:
+            self.complete_marker(dataset, symbol, day).touch()
+        return len(df)
+
+    def _fetch_paged(self, dataset: str, symbol: str, start: str, end: str) -> list:
+        """Follow next_page_token for bars/trades"""
+        api = self._api()
+        fetch = api.get_bars if dataset == 'bars' else api.get_trades
+        rows, token = [], None
+        while True:
+            self.limiter.acquire()
+            page, token = fetch(symbol, start, end, page_token=token)
+            rows.extend(page)
+            if not token:
+                return rows
+
+    def _fetch_orders(self, symbol: str, after: str, end: str) -> list:
+        """
+        /v2/orders has no page token: walk forward on submitted_at
+
+        `after` is exclusive, so each next page starts one microsecond before
+        the last row's timestamp. Orders sharing that timestamp come back
+        again and are skipped by id instead of being lost.
+        """
+        api = self._api()
+        rows, seen = [], set()
+        while True:
+            self.limiter.acquire()
+            page = api.get_orders(status='all', limit=ORDER_PAGE, after=after, until=end,
+                                  direction='asc', symbols=symbol)
+            new = [order for order in page if order['id'] not in seen]
+            seen.update(order['id'] for order in new)
+            rows.extend(_flatten(order) for order in new)
+            if len(page) < ORDER_PAGE:
+                return rows
+            if not new:
+                # A full page of one timestamp: cannot advance past it without skipping rows
+                raise RuntimeError(f"More than {ORDER_PAGE} orders share submitted_at {page[-1]['submitted_at']}")
+            last = pd.Timestamp(page[-1]['submitted_at']) - pd.Timedelta(microseconds=1)
+            after = last.strftime('%Y-%m-%dT%H:%M:%S.%fZ')
+
+    # --------- read ----------
+    def load(self, dataset: str, symbol: str, start: date, end: date) -> pd.DataFrame:
+        """Concatenate cached partitions for [start, end] (no network)"""
+        frames = []
+        day = start
+        while day <= end:
+            path = self.partition_path(dataset, symbol, day)
+            if path.exists():
+                frames.append(pd.read_parquet(path))
+            day += timedelta(days=1)
+        if not frames:
+            return pd.DataFrame()
+        return pd.concat(frames, ignore_index=True)
+
+
+def _flatten(order: dict) -> dict:
+    """Parquet needs flat columns: nested order fields (legs etc.) are stored as JSON text"""
+    return {k: json.dumps(v) if isinstance(v, (dict, list)) else v for k, v in order.items()}
@@ -0,0 +1,145 @@
+from array import array
+from bisect import bisect_left
+
+
+class OrderBook:
+    """
+    Compact top-of-book + depth for one pair
+
+    Each side is two parallel array('d') of prices and sizes kept sorted
+    ascending (best bid at the end, best ask at the start), so an update is
+    a bisect plus a short memmove and no per-level objects are allocated.
+    """
+
+    __slots__ = ('max_depth', 'bid_px', 'bid_sz', 'ask_px', 'ask_sz', 'ts')
+
+    def __init__(self, max_depth: int = 50):
+        """
+        Args:
+            max_depth: Levels kept per side (farther levels are dropped)
+        """
+        self.max_depth = max_depth
+        self.bid_px, self.bid_sz = array('d'), array('d')
+        self.ask_px, self.ask_sz = array('d'), array('d')
+        self.ts = None
+
+    def apply_update(self, bids, asks, reset: bool = False, ts=None):
+        """
+        Apply a snapshot or an incremental diff
+
+        Args:
+            bids: [(price, size), ...]; size 0 removes the level
+            asks: [(price, size), ...]; size 0 removes the level
+            reset: True for a full snapshot (replaces the book)
+            ts: Exchange timestamp of the update
+        """
+        if reset:
+            # Snapshot: one sort per side instead of an insert per level
+            bids = sorted(l for l in bids if l[1] > 0)
+            asks = sorted(l for l in asks if l[1] > 0)
+            self.bid_px = array('d', [l[0] for l in bids])
+            self.bid_sz = array('d', [l[1] for l in bids])
+            self.ask_px = array('d', [l[0] for l in asks])
+            self.ask_sz = array('d', [l[1] for l in asks])
+        else:
+            for price, size in bids:
+                self._set(self.bid_px, self.bid_sz, price, size)
+            for price, size in asks:
+                self._set(self.ask_px, self.ask_sz, price, size)
+
+        # Trim the far end: lowest bids, highest asks
+        if len(self.bid_px) > self.max_depth:
+            cut = len(self.bid_px) - self.max_depth
+            del self.bid_px[:cut], self.bid_sz[:cut]
+        if len(self.ask_px) > self.max_depth:
+            del self.ask_px[self.max_depth:], self.ask_sz[self.max_depth:]
+        self.ts = ts
+
+    def apply_snapshot(self, bids, asks, ts=None) -> int:
+        """
+        Bring the book to a polled snapshot by changing only what moved
+
+        The first snapshot fills the book. After that, levels missing from
+        the snapshot are removed and changed sizes are set in place, so a
+        poll where only the touch moved costs a handful of _set calls
+        rather than rebuilding four arrays.
+
+        Returns:
+            Number of levels changed
+        """
+        if not self.ready:
+            self.apply_update(bids, asks, reset=True, ts=ts)
+            return len(self.bid_px) + len(self.ask_px)
+
+        bid_diff = self._diff(self.bid_px, self.bid_sz, bids)
+        ask_diff = self._diff(self.ask_px, self.ask_sz, asks)
+        self.apply_update(bid_diff, ask_diff, ts=ts)
+        return len(bid_diff) + len(ask_diff)
+
+    @staticmethod
+    def _diff(prices: array, sizes: array, levels) -> list:
+        """Updates that turn one side into levels (size 0 removes)"""
+        new = {price: size for price, size in levels if size > 0}
+        diff = [(price, 0.0) for price in prices if price not in new]
+        for price, size in new.items():
+            i = bisect_left(prices, price)
+            if i == len(prices) or prices[i] != price or sizes[i] != size:
+                diff.append((price, size))
+        return diff
+
+    @staticmethod
+    def _set(prices: array, sizes: array, price: float, size: float):
+        i = bisect_left(prices, price)
+        exists = i < len(prices) and prices[i] == price
+        if size <= 0:
+            if exists:
+                del prices[i], sizes[i]
+        elif exists:
+            sizes[i] = size
+        else:
+            prices.insert(i, price)
+            sizes.insert(i, size)
+
+    # --------- top of book ----------
+    @property
+    def ready(self) -> bool:
+        return bool(self.bid_px) and bool(self.ask_px)
+
+    @property
+    def best_bid(self) -> float:
+        return self.bid_px[-1]
+
+    @property
+    def best_ask(self) -> float:
+        return self.ask_px[0]
+
+    @property
+    def mid(self) -> float:
+        return (self.bid_px[-1] + self.ask_px[0]) / 2
+
+    @property
+    def microprice(self) -> float:
+        """Size-weighted mid: leans toward the side with less resting size"""
+        bid, ask = self.bid_px[-1], self.ask_px[0]
+        bid_size, ask_size = self.bid_sz[-1], self.ask_sz[0]
+        total = bid_size + ask_size
+        if total <= 0:
+            return (bid + ask) / 2
+        return (bid * ask_size + ask * bid_size) / total
+
+    def center(self, method: str) -> float:
+        """Reference price for the grid: 'bid', 'mid' or 'microprice'"""
+        if method == 'mid':
+            return self.mid
+        if method == 'microprice':
+            return self.microprice
+        return self.best_bid
+
+    def depth(self, levels: int = 5) -> dict:
+        """Best-first [(price, size), ...] for each side"""
+        n_bid = min(levels, len(self.bid_px))
+        n_ask = min(levels, len(self.ask_px))
+        return {
+            'bids': [(self.bid_px[-1 - i], self.bid_sz[-1 - i]) for i in range(n_bid)],
+            'asks': [(self.ask_px[i], self.ask_sz[i]) for i in range(n_ask)]
+        }
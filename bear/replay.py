@@ -0,0 +1,114 @@
+import time
+from bear.events import read_events, ReplayDivergence, RecordedError
+from bear.trader import GridTradingBot
+
+
+class ReplayAlpaca:
+    """
+    Drop-in stand-in for AlpacaPaper that answers from a recorded event log
+
+    Every call must match the next recorded event (same method, same args),
+    otherwise the replayed bot has made a different decision than the live one.
+    """
+
+    def __init__(self, events: list):
+        self.events = events
+        self.position = 0
+        self.orders_placed = 0
+        self.diverged = None  # First divergence message (check_orders swallows exceptions)
+        self.exhausted = False
+
+    @property
+    def remaining(self) -> int:
+        return len(self.events) - self.position
+
+    def _next(self, method: str, args: list):
+        if self.position >= len(self.events):
+            self.exhausted = True
+            raise ReplayDivergence(f"Event log exhausted at {method}{tuple(args)}")
+
+        kind, _, rec_method, rec_args, payload = self.events[self.position]
+        if rec_method != method or list(rec_args) != list(args):
+            msg = (f"Event {self.position}: bot called {method}{tuple(args)}, "
+                   f"recorded {rec_method}{tuple(rec_args)}")
+            if self.diverged is None:
+                self.diverged = msg
+            raise ReplayDivergence(msg)
+
+        self.position += 1
+        if kind == 'error':
+            raise RecordedError(payload)
+        return payload
+
+    def clock(self):
+        """Recorded time of the last event served, so time-based logic replays identically"""
+        return self.events[self.position - 1][1] / 1e9 if self.position else 0.0
+
+    def get_price(self, symbol):
+        return self._next('get_price', [symbol])
+
+    def get_quote(self, symbol):
+        return self._next('get_quote', [symbol])
+
+    def get_orderbook(self, symbol, depth=50):
+        return self._next('get_orderbook', [symbol, depth])
+
+    def get_balance(self):
+        return self._next('get_balance', [])
+
+    def buy(self, symbol, qty, price):
+        self.orders_placed += 1
+        return self._next('buy', [symbol, qty, price])
+
+    def sell(self, symbol, qty, price):
+        self.orders_placed += 1
+        return self._next('sell', [symbol, qty, price])
+
+    def get_order(self, order_id):
+        return self._next('get_order', [order_id])
+
+    def cancel_order(self, order_id):
+        return self._next('cancel_order', [order_id])
+
+
+def replay_session(config: dict, path, events: list = None) -> dict:
+    """
+    Re-run a recorded session through GridTradingBot as fast as possible
+
+    Args:
+        config: Same settings the live session ran with
+        path: Event log written by EventRecorder
+        events: Pre-loaded events (skips reading path, for repeated load runs)
+
+    Returns:
+        {'bot', 'events', 'orders_placed', 'elapsed', 'recorded_span'}
+
+    Raises:
+        ReplayDivergence: if the bot's calls stop matching the recording
+    """
+    events = events if events is not None else read_events(path)
+    api = ReplayAlpaca(events)
+    bot = GridTradingBot(config, api=api, notify=lambda text: True)
+
+    start = time.perf_counter()
+    bot.initialize()
+    while api.remaining and bot.active_orders and api.diverged is None:
+        try:
+            bot.tick()
+        except RecordedError:
+            pass  # Live loop logged it and polled again
+        except ReplayDivergence:
+            break
+    elapsed = time.perf_counter() - start
+
+    if api.diverged is not None:
+        raise ReplayDivergence(api.diverged)
+
+    recorded_span = (events[-1][1] - events[0][1]) / 1e9 if events else 0.0
+    return {
+        'bot': bot,
+        'events': api.position,
+        'orders_placed': api.orders_placed,
+        'elapsed': elapsed,
+        'recorded_span': recorded_span
+    }
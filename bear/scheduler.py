@@ -0,0 +1,195 @@
+import heapq
+import math
+import select
+import socket
+import threading
+import time
+from collections import deque
+from bear.volatility import EwmaVolatility
+
+
+class PollScheduler:
+    """
+    Monotonic-clock deadline queue that decides when the bot polls next
+
+    The poll interval shrinks when price is close to a resting order or the
+    market is moving fast, and grows in quiet markets. On average it makes
+    no more requests than fixed polling every base_interval would: a token
+    bucket refills at that baseline rate, so fast polls near a level spend
+    what slow polls in quiet markets saved. Separately, it never lets the
+    bot spend more than its share of the broker's rate limit.
+
+    wait() sleeps in select() on one end of a socketpair. schedule() and
+    wake() write a byte to the other end to cut the sleep short. wake()
+    takes no lock (it only appends to a deque and writes that byte), so
+    it is safe to call from a signal handler that interrupts wait().
+    """
+
+    def __init__(self, base_interval: float = 10, min_interval: float = 1,
+                 max_interval: float = 30, rate_limit: int = 200,
+                 rate_window: float = 60, budget: float = 0.5,
+                 safety: float = 0.25, halflife: float = 10):
+        """
+        Args:
+            base_interval: Interval used until there is enough data to adapt;
+                its request rate is also the long-run average the bot may spend
+            min_interval: Fastest allowed poll (seconds)
+            max_interval: Slowest allowed poll (seconds)
+            rate_limit: Broker requests allowed per rate_window (Alpaca: 200/min)
+            rate_window: Rate limit window (seconds)
+            budget: Fraction of rate_limit this bot may use
+            safety: Poll after this fraction of the expected time-to-level
+            halflife: Volatility EWMA half-life, in quotes
+        """
+        self.base_interval = base_interval
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.rate_window = rate_window
+        self.allowed = rate_limit * budget
+        self.safety = safety
+        self.volatility = EwmaVolatility(halflife)
+
+        self._heap = []          # [(deadline, seq, name)]
+        self._deadlines = {}     # name -> live deadline (stale heap entries are skipped)
+        self._seq = 0
+        self._lock = threading.Lock()
+        self._wakeups = deque()  # Task names from wake(), moved onto the heap by wait()
+        self._reader, self._writer = socket.socketpair()
+        self._reader.setblocking(False)
+        self._writer.setblocking(False)
+
+        self._requests = deque()  # [(monotonic_ts, count)] inside rate_window
+        self._used = 0
+
+        # Baseline bucket: refills at requests_per_poll / base_interval, holds one rate_window's worth
+        self._tokens = 0.0
+        self._rate = 0.0
+        self._refilled = time.monotonic()
+
+    # --------- deadline queue ----------
+    def schedule(self, name: str, delay: float):
+        """(Re)schedule task name to run delay seconds from now"""
+        with self._lock:
+            self._push(name, time.monotonic() + max(delay, 0.0))
+        self._notify()
+
+    def wake(self, name: str = 'poll'):
+        """Run task name immediately (lock-free: safe from other threads and signal handlers)"""
+        self._wakeups.append(name)
+        self._notify()
+
+    def _push(self, name: str, deadline: float):
+        # Caller holds _lock
+        self._seq += 1
+        self._deadlines[name] = deadline
+        heapq.heappush(self._heap, (deadline, self._seq, name))
+
+    def _notify(self):
+        try:
+            self._writer.send(b'\0')
+        except OSError:
+            pass  # Buffer full: wait() already has bytes to wake up on
+
+    def wait(self) -> str:
+        """Block until the earliest task is due, then return its name"""
+        while True:
+            # Drain before reading state: a wake-up after this point leaves a byte for select()
+            try:
+                while self._reader.recv(4096):
+                    pass
+            except OSError:
+                pass
+            with self._lock:
+                now = time.monotonic()
+                while self._wakeups:
+                    self._push(self._wakeups.popleft(), now)
+                while self._heap and self._deadlines.get(self._heap[0][2]) != self._heap[0][0]:
+                    heapq.heappop(self._heap)  # Superseded by a later schedule()
+                timeout = None
+                if self._heap:
+                    deadline, _, name = self._heap[0]
+                    timeout = deadline - now
+                    if timeout <= 0:
+                        heapq.heappop(self._heap)
+                        del self._deadlines[name]
+                        return name
+            select.select([self._reader], [], [], timeout)
+
+    # --------- inputs ----------
+    def observe_price(self, price: float):
+        """Feed the latest quote into the volatility estimate"""
+        self.volatility.update(price, time.monotonic())
+
+    @property
+    def last_price(self):
+        return self.volatility.last_price
+
+    def record_requests(self, count: int):
+        """Account for broker requests just made"""
+        now = time.monotonic()
+        self._requests.append((now, count))
+        self._used += count
+        self._expire(now)
+        self._refill(now)
+        self._tokens -= count
+
+    def _refill(self, now: float):
+        capacity = self._rate * self.rate_window
+        self._tokens = min(capacity, self._tokens + self._rate * (now - self._refilled))
+        self._refilled = now
+
+    def _expire(self, now: float):
+        while self._requests and self._requests[0][0] <= now - self.rate_window:
+            self._used -= self._requests.popleft()[1]
+
+    # --------- decision ----------
+    def next_interval(self, order_prices, requests_per_poll: int) -> float:
+        """
+        Pick the delay until the next poll
+
+        Args:
+            order_prices: Limit prices of resting orders
+            requests_per_poll: Broker requests one poll will cost
+
+        Returns:
+            Seconds until the next poll
+        """
+        interval = self.base_interval
+        if self.last_price and order_prices:
+            distance = min(abs(math.log(p / self.last_price)) for p in order_prices if p > 0)
+            variance_rate = self.volatility.variance_rate
+            if variance_rate is not None:
+                if variance_rate > 0:
+                    # Random-walk estimate of how long price needs to reach the nearest order
+                    interval = self.safety * distance ** 2 / variance_rate
+                else:
+                    interval = self.max_interval
+        elif self.last_price:
+            interval = self.max_interval  # Nothing resting, nothing to catch
+
+        # Rate-limit budget overrides max_interval if the two conflict
+        return max(min(interval, self.max_interval), self._budget_floor(requests_per_poll))
+
+    def _budget_floor(self, requests_per_poll: int) -> float:
+        """Shortest interval the baseline and rate-limit budgets allow right now"""
+        now = time.monotonic()
+        self._refill(now)
+        self._rate = requests_per_poll / self.base_interval
+        floor = max(self.min_interval, requests_per_poll * self.rate_window / self.allowed)
+
+        # Faster than base_interval only on tokens saved by slower polls
+        deficit = requests_per_poll - self._tokens
+        if deficit > 0:
+            floor = max(floor, deficit / self._rate)
+
+        # Window already spent: wait until enough old requests age out
+        self._expire(now)
+        excess = self._used + requests_per_poll - self.allowed
+        if excess > 0:
+            freed = 0
+            for ts, count in self._requests:
+                freed += count
+                if freed >= excess:
+                    floor = max(floor, ts + self.rate_window - now)
+                    break
+        return floor
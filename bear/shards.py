@@ -0,0 +1,142 @@
+import copy
+import logging
+import os
+import signal
+from multiprocessing import Process
+from bear.capital import CapitalLedger
+from bear.gateway import OrderGateway, GatewayClient, gateway_address
+from bear.logger import setup_logger
+from bear.scheduler import PollScheduler
+from bear.status import StatusServer
+from bear.trader import GridTradingBot
+
+
+def split_pairs(pairs: list, workers: int) -> list:
+    """Round-robin pairs over workers, dropping empty shards"""
+    shards = [pairs[i::workers] for i in range(workers)]
+    return [shard for shard in shards if shard]
+
+
+def pair_config(config: dict, pair: str, share: float) -> dict:
+    """
+    Per-pair copy of the settings for one GridTradingBot
+
+    Args:
+        share: Fraction of the polling budget this pair gets
+    """
+    cfg = copy.deepcopy(config)
+    cfg['pair'] = pair
+    polling = cfg.setdefault('polling', {})
+    polling['budget'] = polling.get('budget', 0.5) * share
+    return cfg
+
+
+def run_gateway(config: dict, address, authkey: bytes):
+    """Gateway process entry point"""
+    signal.signal(signal.SIGINT, signal.default_int_handler)
+    setup_logger(level=config['logging']['level'])
+    shards = config.get('shards', {})
+    polling = config.get('polling', {})
+    gateway = OrderGateway(
+        address, authkey,
+        sessions=shards.get('sessions', 4),
+        rate_limit=polling.get('rate_limit', 200),
+        budget=polling.get('budget', 0.5)
+    )
+    try:
+        gateway.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+def run_worker(config: dict, pairs: list, address, authkey: bytes, share: float, index: int = 0):
+    """
+    Strategy worker entry point: one GridTradingBot per pair, one poll task per bot
+
+    All bots in the worker share one GatewayClient and one deadline queue,
+    so a worker is a single thread no matter how many pairs it owns.
+    """
+    signal.signal(signal.SIGINT, signal.default_int_handler)
+    logger = setup_logger(level=config['logging']['level'])
+    api = GatewayClient(address, authkey)
+
+    # Weights span every pair in the account, so this worker's pairs only
+    # ever commit their own slice of the shared cash
+    ledger = CapitalLedger.from_config(config)
+
+    # One status page per worker, on consecutive ports after status.port
+    status = None
+    status_cfg = config.get('status', {})
+    if status_cfg.get('enabled'):
+        status = StatusServer(status_cfg.get('host', '127.0.0.1'),
+                              status_cfg.get('port', 8080) + 1 + index).start()
+
+    bots = {}
+    for pair in pairs:
+        bot = GridTradingBot(pair_config(config, pair, share), api=api, ledger=ledger, status=status)
+        bot.logger = logging.getLogger(f'GridBot.{pair}')
+        bot.initialize()
+        bots[pair] = bot
+
+    queue = PollScheduler()
+    for pair in bots:
+        queue.schedule(pair, 0)
+
+    logger.info(f"Worker {os.getpid()} running {', '.join(pairs)}")
+    try:
+        while True:
+            pair = queue.wait()
+            try:
+                interval = bots[pair].poll()
+            except Exception as e:
+                logger.exception(f"Error polling {pair}: {e}")
+                interval = bots[pair].scheduler.base_interval
+            queue.schedule(pair, interval)
+    except KeyboardInterrupt:
+        api.close()
+
+
+def run_sharded(config: dict):
+    """
+    Start one gateway process and `shards.workers` strategy workers
+
+    Pairs come from `pairs` in settings.yaml (falls back to `pair`).
+    Blocks until every process exits.
+
+    Raises:
+        ValueError: for capital.allocation 'performance' across several workers
+    """
+    logger = logging.getLogger('CryptoBear')
+    shards = config.get('shards', {})
+    pairs = config.get('pairs') or [config['pair']]
+    workers = split_pairs(pairs, shards.get('workers', 2))
+    if len(workers) > 1 and config.get('capital', {}).get('allocation') == 'performance':
+        # Each worker's ledger only sees its own pairs' profit, so the workers would
+        # disagree on the weights and together commit more than the account holds
+        raise ValueError("capital.allocation 'performance' needs every pair in one process: "
+                         "use 'weight' or shards.workers: 1")
+    address = gateway_address(shards)
+    authkey = os.urandom(16)
+    share = 1 / len(pairs)
+
+    processes = [Process(target=run_gateway, args=(config, address, authkey), name='gateway')]
+    for i, shard in enumerate(workers):
+        processes.append(Process(
+            target=run_worker, args=(config, shard, address, authkey, share, i),
+            name=f'worker-{i}'
+        ))
+
+    for p in processes:
+        p.start()
+        logger.info(f"Started {p.name} (pid {p.pid})")
+
+    try:
+        for p in processes[1:]:
+            p.join()
+    except KeyboardInterrupt:
+        logger.info("Received shutdown signal")
+    finally:
+        for p in processes:
+            if p.is_alive():
+                p.terminate()
+            p.join()
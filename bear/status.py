@@ -0,0 +1,115 @@
+import html
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class StatusServer:
+    """
+    Local HTTP status surface served from the bot's own memory
+
+    Bots publish a snapshot once per tick; requests only read the cached
+    JSON, so monitoring costs no broker requests and never blocks trading.
+
+    Routes:
+        /          HTML dashboard
+        /status    JSON snapshot of every published bot
+        /health    200 while every bot ticked within stale_after seconds, else 503
+    """
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 8080, stale_after: float = 120):
+        """
+        Args:
+            host: Interface to bind (keep on localhost unless behind auth)
+            port: TCP port
+            stale_after: Seconds without a tick before /health reports unhealthy
+        """
+        self.host = host
+        self.port = port
+        self.stale_after = stale_after
+        self._snapshots = {}  # {pair: snapshot dict}
+        self._json = b'{}'
+        self._lock = threading.Lock()
+        self._server = None
+
+    def publish(self, pair: str, snapshot: dict):
+        """Replace pair's snapshot and re-encode the cached JSON (called once per tick)"""
+        with self._lock:
+            self._snapshots[pair] = snapshot
+            self._json = json.dumps(self._snapshots, default=str).encode()
+
+    def start(self):
+        """Serve in a daemon thread; returns self"""
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                path = self.path.split('?', 1)[0]
+                if path == '/status':
+                    self._send(200, 'application/json', server._json)
+                elif path == '/health':
+                    healthy, body = server.health()
+                    self._send(200 if healthy else 503, 'application/json', json.dumps(body).encode())
+                elif path == '/':
+                    self._send(200, 'text/html; charset=utf-8', server.render_html().encode())
+                else:
+                    self._send(404, 'text/plain', b'not found')
+
+            def _send(self, code, content_type, body):
+                self.send_response(code)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass  # Keep polling dashboards out of the bot log
+
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self.port = self._server.server_address[1]
+        threading.Thread(target=self._server.serve_forever, daemon=True, name='status').start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+
+    def health(self):
+        """(healthy, {pair: seconds since last tick})"""
+        now = time.time()
+        with self._lock:
+            ages = {pair: now - s['updated'] for pair, s in self._snapshots.items()}
+        healthy = bool(ages) and all(age <= self.stale_after for age in ages.values())
+        return healthy, {'healthy': healthy, 'tick_age': ages}
+
+    def render_html(self) -> str:
+        with self._lock:
+            snapshots = dict(self._snapshots)
+
+        parts = ['<html><head><meta http-equiv="refresh" content="5">'
+                 '<title>CryptoBear</title></head><body style="font-family:monospace">'
+                 '<h1>🧸 CryptoBear</h1>']
+        for pair, s in snapshots.items():
+            pnl = s['pnl']
+            parts.append(
+                f"<h2>{html.escape(pair)} @ ${s['price'] or 0:,.2f}</h2>"
+                f"<p>Inventory {s['inventory']:.6f} | Realized ${pnl['realized']:,.2f} | "
+                f"Unrealized ${pnl['unrealized']:,.2f} | Cycles {pnl['cycles']} | "
+                f"Spread {s['grid']['spread']:.3%} | Last tick {s['loop']['tick_ms']:.1f} ms, "
+                f"next in {s['loop']['next_poll']:.1f}s</p>"
+            )
+            parts.append('<table border="1" cellpadding="4"><tr><th>Order</th><th>Side</th>'
+                         '<th>Price</th><th>Qty</th><th>Level</th></tr>')
+            for o in s['orders']:
+                parts.append(
+                    f"<tr><td>{html.escape(str(o['id']))}</td><td>{o['side']}</td>"
+                    f"<td>${o['price']:,.2f}</td><td>{o['qty']}</td><td>{o['level']}</td></tr>"
+                )
+            parts.append('</table><h3>Recent fills</h3><ul>')
+            for f in reversed(s['fills']):
+                parts.append(f"<li>{f['time']} {f['side'].upper()} {f['qty']} @ ${f['price']:,.2f}</li>")
+            parts.append('</ul>')
+        parts.append('</body></html>')
+        return ''.join(parts)
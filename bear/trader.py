@@ -1,9 +1,15 @@
 import logging
 import time
+from collections import deque
 from datetime import datetime
 from bear.alpaca_rest import AlpacaPaper
+from bear.capital import CapitalLedger
+from bear.execution import SlicedExecutor
 from bear.grid import GridCalculator
+from bear.orderbook import OrderBook
+from bear.scheduler import PollScheduler
 from bear.telegram import teddy_say
+from bear.volatility import RollingATR
 
 
 class GridTradingBot:
@@ -12,13 +18,41 @@ class GridTradingBot:
     and manages fills by placing counter-orders
     """
 
-    def __init__(self, config: dict):
+    def __init__(self, config: dict, api=None, notify=teddy_say, recorder=None, ledger=None,
+                 status=None):
+        """
+        Args:
+            config: Settings loaded from config/settings.yaml
+            api: Broker client (defaults to AlpacaPaper; ReplayAlpaca for replays)
+            notify: Callable used for Telegram messages
+            recorder: Optional EventRecorder passed to the default AlpacaPaper
+            ledger: CapitalLedger shared with other grids in the account
+                (defaults to a private ledger for this pair alone)
+            status: Optional StatusServer to publish a snapshot to every tick
+        """
         self.config = config
-        self.api = AlpacaPaper()
+        self.api = api or AlpacaPaper(recorder=recorder)
+        execution = config.get('execution', {})
+        if execution.get('slicing'):
+            # Large orders go out as child orders; the bot only ever sees the parent
+            self.api = SlicedExecutor(
+                self.api,
+                max_child_notional=execution.get('max_child_notional', 500),
+                visible=execution.get('visible', 1),
+                interval=execution.get('interval', 0),
+                max_retries=execution.get('max_retries', 3)
+            )
+        self.notify = notify
+        # Quote time source; AlpacaPaper/ReplayAlpaca stamp it so replays see the same times
+        self.clock = getattr(self.api, 'clock', time.time)
+
+        adaptive = config['grid'].get('adaptive', {})
+        self.adaptive = adaptive if adaptive.get('enabled') else None
         self.grid_calc = GridCalculator(
             spread=config['grid']['spread'],
             count=config['grid']['count'],
-            risk_per_trade=config['risk']['per_trade']
+            risk_per_trade=config['risk']['per_trade'],
+            adaptive=self.adaptive
         )
         self.logger = logging.getLogger('GridBot')
 
@@ -27,8 +61,46 @@ class GridTradingBot:
         self.inventory = 0.0  # Current crypto holdings
         self.buy_queue = []  # FIFO queue: [(price, qty, timestamp)]
         self.completed_cycles = []  # List of profit dicts
+        self.recent_fills = deque(maxlen=50)  # For the status page
         self.grid_levels = None  # Grid structure
         self.pair = config['pair']
+        self.ledger = ledger or CapitalLedger.from_config(config, [self.pair])
+        self.last_price = None  # Latest quote, refreshed every tick
+        self.position_size = None  # Qty per grid order, set by initialize()
+
+        # Grid reference price: 'bid' uses the plain quote, 'mid'/'microprice' track a book
+        # (book_depth 1 reads the top-of-book quote, more reads the orderbook endpoint)
+        self.center = config['grid'].get('center', 'bid')
+        self.book = None
+        if self.center != 'bid':
+            self.book = OrderBook(max_depth=config['grid'].get('book_depth', 1))
+
+        # Volatility-adaptive grid
+        self.atr = None
+        self._next_resize = 0.0
+        if self.adaptive:
+            # Bars are built from poll quotes only; a bar that sees just one or two
+            # samples reports a fraction of the real range, so keep bars long
+            # enough to collect bar_samples quotes even at the slowest poll
+            bar_seconds = self.adaptive.get('bar_seconds', 300)
+            min_bar = self.adaptive.get('bar_samples', 10) * config.get('polling', {}).get('max_interval', 30)
+            if bar_seconds < min_bar:
+                self.logger.warning(f"bar_seconds {bar_seconds}s is too short for polls up to "
+                                    f"max_interval apart, using {min_bar}s bars")
+                bar_seconds = min_bar
+            self.atr = RollingATR(n=self.adaptive.get('atr_bars', 14), bar_seconds=bar_seconds)
+
+        # Status surface
+        self.status = status
+        self.loop_stats = {'ticks': 0, 'tick_ms': 0.0, 'next_poll': 0.0}
+
+        polling = config.get('polling', {})
+        self.scheduler = PollScheduler(
+            min_interval=polling.get('min_interval', 1),
+            max_interval=polling.get('max_interval', 30),
+            rate_limit=polling.get('rate_limit', 200),
+            budget=polling.get('budget', 0.5)
+        )
 
     def initialize(self):
         """
@@ -37,11 +109,12 @@ class GridTradingBot:
         self.logger.info("Initializing grid trading bot...")
 
         # Get current market data
-        current_price = self.api.get_price(self.pair)
-        balance = self.api.get_balance()
+        current_price = self._refresh_price()
+        self.ledger.maybe_sync(self.api, self.clock())
+        balance = self.ledger.budget(self.pair)
 
         self.logger.info(f"Current price: ${current_price:,.2f}")
-        self.logger.info(f"Account balance: ${balance:,.2f}")
+        self.logger.info(f"Allocated balance: ${balance:,.2f}")
 
         # Calculate grid levels
         self.grid_levels = self.grid_calc.calculate_grid_levels(current_price)
@@ -51,6 +124,7 @@ class GridTradingBot:
 
         self.logger.info(f"Grid center: ${self.grid_levels['center_price']:,.2f}")
         self.logger.info(f"Position size: {qty} per order")
+        self.position_size = qty
 
         # Place buy orders only (sell orders will be placed when buys fill)
         # This is required for crypto paper trading since you can't sell what you don't own
@@ -66,13 +140,18 @@ Size: {qty} {self.pair} per order
 Balance: ${balance:,.2f}
 
 Sell orders will be placed as buys fill."""
-        teddy_say(msg)
+        self.notify(msg)
 
+        self._publish()
         self.logger.info(f"Grid initialized with {len(self.active_orders)} buy orders")
         self.logger.info("Sell orders will be placed when corresponding buys fill")
 
     def _place_initial_order(self, side: str, qty: float, price: float, level: int):
         """Place an order during initialization"""
+        price = self._passive(side, price)
+        ok, token = self._reserve(side, qty, price)
+        if not ok:
+            return
         try:
             if side == 'buy':
                 response = self.api.buy(self.pair, qty, price)
@@ -84,40 +163,178 @@ Sell orders will be placed as buys fill."""
                 'side': side,
                 'price': price,
                 'qty': qty,
-                'level': level
+                'level': level,
+                'reservation': token
             }
 
             self.logger.info(f"Placed {side} order: {qty} @ ${price} (level {level})")
 
         except Exception as e:
+            self.ledger.release(token)
             self.logger.error(f"Failed to place {side} order at ${price}: {e}")
-            teddy_say(f"⚠️ Order failed: {side} {qty} @ ${price}")
+            self.notify(f"⚠️ Order failed: {side} {qty} @ ${price}")
 
     def run(self, poll_interval=10):
         """
         Main event loop: monitor orders and handle fills
+
+        poll_interval is only the starting cadence; after that the scheduler
+        adapts it to price proximity, volatility and rate-limit budget.
         """
-        self.logger.info(f"Starting main loop (polling every {poll_interval}s)")
+        self.logger.info(f"Starting main loop (adaptive polling, starting at {poll_interval}s)")
+        self.scheduler.base_interval = poll_interval
+        self.scheduler.schedule('poll', 0)
 
         while True:
             try:
-                # Check for filled orders
-                filled_orders = self.check_orders()
-
-                # Process each fill
-                for order_data in filled_orders:
-                    self.handle_fill(order_data)
-
-                # Sleep
-                time.sleep(poll_interval)
+                self.scheduler.wait()
+                interval = self.poll()
+                self.scheduler.schedule('poll', interval)
+                self.logger.debug(f"Next poll in {interval:.1f}s")
 
             except KeyboardInterrupt:
                 self.logger.info("Received shutdown signal")
                 break
             except Exception as e:
                 self.logger.exception(f"Error in main loop: {e}")
-                teddy_say(f"⚠️ Bot error: {e}")
-                time.sleep(poll_interval)
+                self.notify(f"⚠️ Bot error: {e}")
+                self.scheduler.schedule('poll', poll_interval)
+
+    def poll(self) -> float:
+        """
+        Run one tick and account for it in the scheduler
+
+        Returns:
+            Seconds until the next poll should run
+        """
+        start = time.perf_counter()
+
+        # Quote + one status check per order + one counter-order per fill
+        polled = len(self.active_orders)
+        filled_orders = self.tick()
+        self.scheduler.record_requests(1 + polled + len(filled_orders))
+
+        interval = self.scheduler.next_interval(
+            [o['price'] for o in self.active_orders.values()],
+            requests_per_poll=1 + len(self.active_orders)
+        )
+
+        self.loop_stats = {
+            'ticks': self.loop_stats['ticks'] + 1,
+            'tick_ms': (time.perf_counter() - start) * 1000,
+            'next_poll': interval
+        }
+        self._publish()
+        return interval
+
+    def tick(self):
+        """
+        One polling pass: refresh the quote, detect fills, place counter-orders
+
+        Returns:
+            List of filled order dicts that were handled
+        """
+        self.last_price = self._refresh_price()
+        self.scheduler.observe_price(self.last_price)
+        if self.atr is not None:
+            self._update_volatility(self.last_price, self.clock())
+
+        filled_orders = self.check_orders()
+        # After check_orders, so the sync knows which buys have partially filled
+        self.ledger.maybe_sync(self.api, self.clock())
+        for order_data in filled_orders:
+            self.handle_fill(order_data)
+        return filled_orders
+
+    def _refresh_price(self) -> float:
+        """Fetch the grid reference price (one broker request either way)"""
+        if self.book is None:
+            return self.api.get_price(self.pair)
+
+        if self.book.max_depth == 1:
+            quote = self.api.get_quote(self.pair)
+            self.book.apply_snapshot([(quote['bid'], quote['bid_size'])],
+                                     [(quote['ask'], quote['ask_size'])], ts=quote['t'])
+        else:
+            snapshot = self.api.get_orderbook(self.pair, self.book.max_depth)
+            self.book.apply_snapshot(snapshot['b'], snapshot['a'], ts=snapshot['t'])
+        return self.book.center(self.center)
+
+    def _passive(self, side: str, price: float) -> float:
+        """Keep the order from crossing the spread when we have a book"""
+        if self.book is None or not self.book.ready:
+            return price
+        return self.grid_calc.passive_price(side, price, self.book.best_bid, self.book.best_ask)
+
+    def _update_volatility(self, price: float, now: float):
+        """Feed the ATR and, every check_every seconds, let the grid follow it"""
+        self.atr.update(price, now)
+        if now < self._next_resize or not self.atr.ready:
+            return
+        self._next_resize = now + self.adaptive.get('check_every', 60)
+
+        old_spread = self.grid_calc.spread
+        if self.grid_calc.adapt(self.atr.percent()):
+            self.logger.info(
+                f"Volatility regime change (ATR {self.atr.percent():.3%}): spread "
+                f"{old_spread:.3%} -> {self.grid_calc.spread:.3%}, "
+                f"{self.grid_calc.levels_per_side} levels per side"
+            )
+            self.regrid(price)
+
+    def regrid(self, center_price: float):
+        """
+        Redraw the grid around center_price with as few order changes as possible
+
+        Resting grid buys within half a spacing of a new level are kept and
+        relabelled; only the leftovers are cancelled and only uncovered levels
+        get new orders. Counter-orders (level None) are never touched. A
+        cancelled buy that had partly filled still gets its fill booked.
+        """
+        new_levels = self.grid_calc.calculate_grid_levels(center_price)
+        tolerance = self.grid_calc.spread * center_price / 2
+
+        resting = [oid for oid, o in self.active_orders.items()
+                   if o['side'] == 'buy' and o['level'] is not None]
+        keep = set()
+        missing = []
+        for price, level in new_levels['buy_levels']:
+            match = next((oid for oid in resting if oid not in keep
+                          and abs(self.active_orders[oid]['price'] - price) <= tolerance), None)
+            if match is None:
+                missing.append((price, level))
+            else:
+                keep.add(match)
+                self.active_orders[match]['level'] = level
+
+        cancelled = 0
+        for oid in resting:
+            if oid in keep:
+                continue
+            try:
+                self.api.cancel_order(oid)
+                cancelled += 1
+                # Whatever filled before the cancel landed is booked like any other fill
+                order_data = self.api.get_order(oid)
+            except Exception as e:
+                # Most likely it just filled; check_orders will pick that up
+                self.logger.error(f"Failed to cancel order {oid}: {e}")
+                continue
+            if order_data['status'] in ('canceled', 'expired', 'rejected'):
+                order_data = self._retire(oid, order_data)
+                if order_data is not None:
+                    self.handle_fill(order_data)
+            else:
+                # Filled first, or the cancel is still pending: off the grid, check_orders settles it
+                self.active_orders[oid]['level'] = None
+
+        self.grid_levels = new_levels
+        for price, level in missing:
+            self._place_initial_order('buy', self.position_size, price, level)
+
+        self.logger.info(
+            f"Regrid: kept {len(keep)}, cancelled {cancelled}, placed {len(missing)} buy orders"
+        )
 
     def check_orders(self):
         """
@@ -129,19 +346,52 @@ Sell orders will be placed as buys fill."""
             try:
                 order_data = self.api.get_order(order_id)
 
+                tracked = self.active_orders[order_id]
+                if tracked['side'] == 'buy' and float(order_data.get('filled_qty') or 0) > 0:
+                    # What filled already left broker cash; tell the ledger so a sync
+                    # before handle_fill does not hold it back a second time
+                    self.ledger.partial_fill(
+                        tracked.get('reservation'),
+                        float(order_data['filled_qty']) * float(order_data['filled_avg_price'])
+                    )
+
                 if order_data['status'] == 'filled':
                     # Add our tracking metadata
-                    order_data['_tracked'] = self.active_orders[order_id]
+                    order_data['_tracked'] = tracked
                     filled_orders.append(order_data)
 
                     # Remove from active tracking
                     del self.active_orders[order_id]
 
+                elif order_data['status'] in ('canceled', 'expired', 'rejected'):
+                    # Dead: stop polling it; any part that filled is still a fill
+                    order_data = self._retire(order_id, order_data)
+                    if order_data is not None:
+                        filled_orders.append(order_data)
+
             except Exception as e:
                 self.logger.error(f"Error checking order {order_id}: {e}")
 
         return filled_orders
 
+    def _retire(self, order_id: str, order_data: dict):
+        """
+        Stop tracking an order that ended before filling completely
+
+        Returns:
+            order_data tagged for handle_fill if part of it filled (spend() then
+            frees the rest of the reservation), else None after releasing it all
+        """
+        tracked = self.active_orders.pop(order_id)
+        filled = float(order_data.get('filled_qty') or 0)
+        if filled > 0:
+            order_data['_tracked'] = tracked
+            self.logger.warning(f"Order {order_id} {order_data['status']} after filling {filled}, booking that part")
+            return order_data
+        self.ledger.release(tracked.get('reservation'))
+        self.logger.warning(f"Order {order_id} {order_data['status']}, dropped from tracking")
+        return None
+
     def handle_fill(self, order_data: dict):
         """
         React to order fill: update inventory, place counter-order, track P&L
@@ -152,21 +402,25 @@ Sell orders will be placed as buys fill."""
         timestamp = datetime.now()
 
         self.logger.info(f"{side.upper()} order filled: {qty} @ ${filled_price:,.2f}")
+        self.recent_fills.append({'time': timestamp, 'side': side, 'price': filled_price, 'qty': qty})
 
         # Update inventory
         if side == 'buy':
             self.inventory += qty
             self.buy_queue.append((filled_price, qty, timestamp))
             counter_side = 'sell'
+            self.ledger.spend(order_data.get('_tracked', {}).get('reservation'), filled_price * qty)
         else:  # sell
             self.inventory -= qty
             counter_side = 'buy'
 
             # Match sell to buy for P&L tracking
+            profit = 0.0
             if self.buy_queue:
                 profit = self._match_sell_to_buy(filled_price, qty)
                 if profit > 0:
                     self._send_profit_report(profit, filled_price, qty)
+            self.ledger.credit(self.pair, filled_price * qty, profit)
 
         # Determine counter-order price
         counter_price = self.grid_calc.get_counter_level(
@@ -183,12 +437,16 @@ Price: ${filled_price:,.2f}
 Qty: {qty}
 Total: ${filled_price * qty:,.2f}
 Inventory: {self.inventory:.6f} {self.pair}"""
-        teddy_say(msg)
+        self.notify(msg)
 
     def place_order(self, side: str, qty: float, price: float):
         """
         Place a new order and add to tracking
         """
+        price = self._passive(side, price)
+        ok, token = self._reserve(side, qty, price)
+        if not ok:
+            return
         try:
             if side == 'buy':
                 response = self.api.buy(self.pair, qty, price)
@@ -200,14 +458,73 @@ Inventory: {self.inventory:.6f} {self.pair}"""
                 'side': side,
                 'price': price,
                 'qty': qty,
-                'level': None  # Counter-orders don't have grid levels
+                'level': None,  # Counter-orders don't have grid levels
+                'reservation': token
             }
 
             self.logger.info(f"Placed {side} order: {qty} @ ${price:,.2f}")
 
         except Exception as e:
+            self.ledger.release(token)
             self.logger.error(f"Failed to place {side} order: {e}")
-            teddy_say(f"⚠️ Order failed: {side} {qty} @ ${price}")
+            self.notify(f"⚠️ Order failed: {side} {qty} @ ${price}")
+
+    def _reserve(self, side: str, qty: float, price: float):
+        """
+        Hold cash for a buy in the capital ledger (sells need none)
+
+        Returns:
+            (ok, token): ok is False when the pair's allocation can't cover the order
+        """
+        if side != 'buy':
+            return True, None
+        token = self.ledger.reserve(self.pair, qty * price)
+        if token is None:
+            self.logger.warning(
+                f"Skipping buy {qty} @ ${price:,.2f}: only "
+                f"${self.ledger.available(self.pair):,.2f} of allocated cash left"
+            )
+            return False, None
+        return True, token
+
+    def snapshot(self) -> dict:
+        """In-memory state for the status page (no broker calls)"""
+        price = self.last_price
+        unrealized = sum((price - p) * q for p, q, _ in self.buy_queue) if price else 0.0
+        return {
+            'pair': self.pair,
+            'updated': time.time(),
+            'price': price,
+            'inventory': self.inventory,
+            'orders': [
+                {'id': oid, 'side': o['side'], 'price': o['price'], 'qty': o['qty'], 'level': o['level']}
+                for oid, o in self.active_orders.items()
+            ],
+            'grid': {
+                'spread': self.grid_calc.spread,
+                'levels_per_side': self.grid_calc.levels_per_side,
+                'center_price': self.grid_levels['center_price'] if self.grid_levels else None,
+                'buy_levels': self.grid_levels['buy_levels'] if self.grid_levels else [],
+                'sell_levels': self.grid_levels['sell_levels'] if self.grid_levels else []
+            },
+            'fills': list(self.recent_fills),
+            'pnl': {
+                'realized': sum(c['profit'] for c in self.completed_cycles),
+                'unrealized': unrealized,
+                'cycles': len(self.completed_cycles)
+            },
+            'book': self.book.depth() if self.book is not None and self.book.ready else None,
+            'capital': {
+                'budget': self.ledger.budget(self.pair),
+                'reserved': self.ledger.reserved.get(self.pair, 0.0),
+                'cash': self.ledger.cash
+            },
+            'loop': dict(self.loop_stats)
+        }
+
+    def _publish(self):
+        if self.status is not None:
+            self.status.publish(self.pair, self.snapshot())
 
     def _match_sell_to_buy(self, sell_price: float, sell_qty: float) -> float:
         """
@@ -261,4 +578,4 @@ Profit: ${profit:.2f}
 
 Total Cycles: {total_cycles}
 Total Profit: ${total_profit:.2f}"""
-        teddy_say(msg)
+        self.notify(msg)
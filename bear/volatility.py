@@ -0,0 +1,118 @@
+import math
+
+
+class EwmaVolatility:
+    """
+    Exponentially weighted variance of log returns, per second
+
+    O(1) per quote and a handful of floats per pair.
+    """
+
+    __slots__ = ('alpha', 'variance_rate', 'last_price', 'last_ts')
+
+    def __init__(self, halflife: float = 10):
+        """
+        Args:
+            halflife: Number of quotes after which an observation's weight halves
+        """
+        self.alpha = 1 - 0.5 ** (1 / halflife)
+        self.variance_rate = None
+        self.last_price = None
+        self.last_ts = None
+
+    def update(self, price: float, ts: float):
+        """
+        Args:
+            price: Latest quote
+            ts: Quote time in seconds (any monotonic-enough clock)
+        """
+        if self.last_price and price > 0 and ts > self.last_ts:
+            rate = math.log(price / self.last_price) ** 2 / (ts - self.last_ts)
+            if self.variance_rate is None:
+                self.variance_rate = rate
+            else:
+                self.variance_rate += self.alpha * (rate - self.variance_rate)
+        self.last_price = price
+        self.last_ts = ts
+
+    def sigma(self, horizon: float) -> float:
+        """Expected stddev of log return over horizon seconds (0.0 until warmed up)"""
+        if self.variance_rate is None:
+            return 0.0
+        return math.sqrt(self.variance_rate * horizon)
+
+
+class RollingATR:
+    """
+    Average true range over the last n time bars built from quotes
+
+    True ranges sit in a fixed-size ring buffer with a running sum, so each
+    quote costs O(1) regardless of the window length. High/low only see the
+    quotes fed in, so bars must span many of them (see bar_samples in
+    settings.yaml) or the range is understated.
+    """
+
+    __slots__ = ('bar_seconds', 'ranges', 'index', 'filled', 'total',
+                 'bar_start', 'high', 'low', 'close', 'prev_close')
+
+    def __init__(self, n: int = 14, bar_seconds: float = 60):
+        """
+        Args:
+            n: Number of bars in the average
+            bar_seconds: Bar length
+        """
+        self.bar_seconds = bar_seconds
+        self.ranges = [0.0] * n
+        self.index = 0
+        self.filled = 0
+        self.total = 0.0
+        self.bar_start = None
+        self.high = self.low = self.close = None
+        self.prev_close = None
+
+    def update(self, price: float, ts: float):
+        if self.bar_start is None:
+            self._open_bar(price, ts)
+            return
+
+        if ts - self.bar_start >= self.bar_seconds:
+            self._close_bar()
+            self._open_bar(price, ts)
+            return
+
+        if price > self.high:
+            self.high = price
+        elif price < self.low:
+            self.low = price
+        self.close = price
+
+    def _open_bar(self, price: float, ts: float):
+        self.bar_start = ts
+        self.high = self.low = self.close = price
+
+    def _close_bar(self):
+        high, low = self.high, self.low
+        if self.prev_close is not None:
+            high = max(high, self.prev_close)
+            low = min(low, self.prev_close)
+        true_range = high - low
+
+        self.total += true_range - self.ranges[self.index]
+        self.ranges[self.index] = true_range
+        self.index = (self.index + 1) % len(self.ranges)
+        self.filled = min(self.filled + 1, len(self.ranges))
+        self.prev_close = self.close
+
+    @property
+    def ready(self) -> bool:
+        """True once n complete bars have been seen"""
+        return self.filled == len(self.ranges)
+
+    @property
+    def value(self) -> float:
+        """ATR in price units (average over the bars seen so far)"""
+        return self.total / self.filled if self.filled else 0.0
+
+    def percent(self) -> float:
+        """ATR as a fraction of the last price"""
+        return self.value / self.close if self.close else 0.0
@@ -0,0 +1,38 @@
+"""Download historical data into the local Parquet cache
+
+Usage:
+    python download_history.py DATASET START END [SYMBOL]
+
+DATASET is bars, trades or orders; START/END are YYYY-MM-DD (UTC, inclusive).
+SYMBOL defaults to the pair in config/settings.yaml. Days already cached are skipped.
+"""
+import sys
+from datetime import date
+from pathlib import Path
+from bear import config
+from bear.history import HistoryDownloader
+from bear.logger import setup_logger
+
+if __name__ == '__main__':
+    if len(sys.argv) < 4:
+        print(__doc__)
+        sys.exit(1)
+
+    logger = setup_logger(level='INFO')
+    dataset = sys.argv[1]
+    start = date.fromisoformat(sys.argv[2])
+    end = date.fromisoformat(sys.argv[3])
+    symbol = sys.argv[4] if len(sys.argv) > 4 else config['pair']
+
+    history_cfg = config.get('history', {})
+    downloader = HistoryDownloader(
+        Path(__file__).parent / history_cfg.get('cache_dir', 'data'),
+        workers=history_cfg.get('workers', 4),
+        rate_limit=config.get('polling', {}).get('rate_limit', 200),
+        budget=history_cfg.get('budget', 0.5)
+    )
+    stats = downloader.download(dataset, symbol, start, end)
+
+    print(f"\nFetched {stats['days']} day(s), {stats['rows']} rows")
+    if stats['failed']:
+        print(f"Failed days (rerun to retry): {', '.join(str(d) for d in sorted(stats['failed']))}")
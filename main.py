@@ -2,6 +2,11 @@ from bear import config
 from bear.logger import setup_logger
 from bear.trader import GridTradingBot
 from bear.telegram import teddy_say
+from bear.events import EventRecorder
+from bear.shards import run_sharded
+from bear.status import StatusServer
+from datetime import datetime
+from pathlib import Path
 import signal
 import sys
 
@@ -17,8 +22,33 @@ if __name__ == '__main__':
     logger = setup_logger(level=config['logging']['level'])
     signal.signal(signal.SIGINT, signal_handler)
 
+    # Sharded mode: gateway + worker processes, one bot per pair
+    if config.get('shards', {}).get('workers', 0) > 0:
+        teddy_say("🚀 Grid bot starting (sharded)...")
+        run_sharded(config)
+        sys.exit(0)
+
+    # Optional event log (one file per session) for replay.py
+    recorder = None
+    events_cfg = config.get('events', {})
+    if events_cfg.get('record'):
+        events_dir = Path(__file__).parent / events_cfg.get('dir', 'logs/events')
+        recorder = EventRecorder(events_dir / f"session_{datetime.now():%Y%m%d_%H%M%S}.msgpack")
+        logger.info(f"Recording events to {recorder.path}")
+
+    # Optional local status page, served from the bot's memory
+    status = None
+    status_cfg = config.get('status', {})
+    if status_cfg.get('enabled'):
+        status = StatusServer(status_cfg.get('host', '127.0.0.1'), status_cfg.get('port', 8080)).start()
+        logger.info(f"Status page on http://{status.host}:{status.port}/")
+
     # Initialize bot
-    bot = GridTradingBot(config)
+    bot = GridTradingBot(config, recorder=recorder, status=status)
+
+    # kill -USR1 <pid> forces an immediate poll
+    if hasattr(signal, 'SIGUSR1'):
+        signal.signal(signal.SIGUSR1, lambda sig, frame: bot.scheduler.wake())
 
     try:
         teddy_say("🚀 Grid bot starting...")
@@ -0,0 +1,42 @@
+"""Replay a recorded session through the bot logic (no network, no Telegram)
+
+Usage:
+    python replay.py logs/events/session_YYYYMMDD_HHMMSS.msgpack [repeat]
+
+repeat > 1 re-runs the same log back to back as a load test of the hot path.
+"""
+import sys
+from bear import config
+from bear.events import read_events
+from bear.replay import replay_session
+
+if __name__ == '__main__':
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(1)
+
+    path = sys.argv[1]
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 1
+    events = read_events(path)
+
+    total_events = 0
+    total_elapsed = 0.0
+    for _ in range(repeat):
+        result = replay_session(config, path, events=events)
+        total_events += result['events']
+        total_elapsed += result['elapsed']
+
+    bot = result['bot']
+    print("\n" + "=" * 60)
+    print("REPLAY COMPLETE")
+    print("=" * 60)
+    print(f"Events replayed:  {result['events']} / {len(events)}")
+    print(f"Orders placed:    {result['orders_placed']}")
+    print(f"Inventory:        {bot.inventory:.6f} {bot.pair}")
+    print(f"Completed cycles: {len(bot.completed_cycles)}")
+    print(f"Total profit:     ${sum(c['profit'] for c in bot.completed_cycles):.2f}")
+    print(f"Recorded span:    {result['recorded_span']:.1f}s")
+    if total_elapsed > 0:
+        print(f"Replay rate:      {total_events / total_elapsed:,.0f} events/s over {repeat} run(s)")
+        if result['recorded_span'] > 0:
+            print(f"Speedup:          {result['recorded_span'] * repeat / total_elapsed:,.0f}x real time")
@@ -0,0 +1,129 @@
+"""Check SlicedExecutor fills, cancels and send failures against a fake broker (no network)"""
+import itertools
+from bear.execution import SlicedExecutor
+
+
+class FakeBroker:
+    """Keeps child orders in memory; the test moves them along by hand"""
+
+    def __init__(self, fail_sends=()):
+        self.orders = {}
+        self.sends = 0
+        self.fail_sends = set(fail_sends)  # 1-based send numbers that raise
+        self._ids = itertools.count(1)
+
+    def buy(self, symbol, qty, price):
+        self.sends += 1
+        if self.sends in self.fail_sends:
+            raise RuntimeError('insufficient balance')
+        order_id = f"c{next(self._ids)}"
+        self.orders[order_id] = {'id': order_id, 'status': 'new', 'qty': qty,
+                                 'filled_qty': '0', 'filled_avg_price': None}
+        return dict(self.orders[order_id])
+
+    def get_order(self, order_id):
+        return dict(self.orders[order_id])
+
+    def cancel_order(self, order_id):
+        self.orders[order_id]['status'] = 'canceled'
+
+    def fill(self, order_id, qty, price=100000.0):
+        order = self.orders[order_id]
+        order['filled_qty'] = str(qty)
+        order['filled_avg_price'] = str(price)
+        order['status'] = 'filled' if qty >= order['qty'] else 'partially_filled'
+
+    def resting(self):
+        return [oid for oid, o in self.orders.items() if o['status'] in ('new', 'partially_filled')]
+
+
+def sliced(broker, **kwargs):
+    # 0.01 BTC @ $100k = $1,000 -> five $200 children
+    return SlicedExecutor(broker, max_child_notional=200, **kwargs)
+
+
+if __name__ == '__main__':
+    # Fill on a live child shows up on the parent before the child is done
+    broker = FakeBroker()
+    executor = sliced(broker)
+    parent = executor.buy('BTCUSD', 0.01, 100000)
+    broker.fill('c1', 0.001)
+    report = executor.get_order(parent['id'])
+    assert report['status'] == 'partially_filled' and float(report['filled_qty']) == 0.001, report
+    print("[OK] live child's partial fill reported on the parent")
+
+    # ...and that blocks a cancel instead of dropping the filled BTC
+    try:
+        executor.cancel_order(parent['id'])
+        raise AssertionError("cancel of a partially filled parent went through")
+    except RuntimeError:
+        pass
+    assert broker.resting() == ['c1']
+    print("[OK] partially filled parent is not cancelled")
+
+    # Fill that lands between the last poll and the cancel is kept and reported once
+    broker = FakeBroker()
+    executor = sliced(broker)
+    parent = executor.buy('BTCUSD', 0.01, 100000)
+    executor.get_order(parent['id'])
+    broker.fill('c1', 0.0005)
+    executor.cancel_order(parent['id'])
+    report = executor.get_order(parent['id'])
+    assert report['status'] == 'canceled' and float(report['filled_qty']) == 0.0005, report
+    assert parent['id'] not in executor.parents and not broker.resting()
+    print("[OK] fill racing the cancel reported with the canceled parent")
+
+    # Children fill one by one until the parent is done
+    broker = FakeBroker()
+    executor = sliced(broker)
+    parent = executor.buy('BTCUSD', 0.01, 100000)
+    for i in range(1, 6):
+        broker.fill(f"c{i}", 0.002)
+        report = executor.get_order(parent['id'])
+    assert report['status'] == 'filled' and float(report['filled_qty']) == 0.01, report
+    print("[OK] five children fill the parent")
+
+    # Second of two visible children fails to send: parent is still tracked
+    broker = FakeBroker(fail_sends={2})
+    executor = sliced(broker, visible=2)
+    parent = executor.buy('BTCUSD', 0.01, 100000)
+    assert parent['id'] in executor.parents and broker.resting() == ['c1'], broker.orders
+    broker.fill('c1', 0.002)
+    executor.get_order(parent['id'])
+    assert len(broker.resting()) == 2
+    print("[OK] failed second send leaves the first child tracked and is retried")
+
+    # First send fails: nothing rests, the caller sees the error
+    broker = FakeBroker(fail_sends={1})
+    executor = sliced(broker, visible=2)
+    try:
+        executor.buy('BTCUSD', 0.01, 100000)
+        raise AssertionError("first send failure was swallowed")
+    except RuntimeError:
+        pass
+    assert not executor.parents and not broker.resting()
+    print("[OK] failed first send raises with nothing resting")
+
+    # Rejected child: no resend, parent ends rejected
+    broker = FakeBroker()
+    executor = sliced(broker)
+    parent = executor.buy('BTCUSD', 0.01, 100000)
+    broker.orders['c1']['status'] = 'rejected'
+    report = executor.get_order(parent['id'])
+    assert report['status'] == 'rejected' and broker.sends == 1, report
+    print("[OK] rejected child ends the parent without a resend")
+
+    # Expired children are re-sent at most max_retries times
+    broker = FakeBroker()
+    executor = sliced(broker, max_retries=2)
+    parent = executor.buy('BTCUSD', 0.01, 100000)
+    for _ in range(10):
+        for order_id in broker.resting():
+            broker.orders[order_id]['status'] = 'expired'
+        report = executor.get_order(parent['id'])
+        if report['status'] != 'new':
+            break
+    assert report['status'] == 'canceled' and broker.sends == 3, (report, broker.sends)
+    print("[OK] expired children retried max_retries times, then given up")
+
+    print("\nAll execution checks passed")
@@ -0,0 +1,94 @@
+"""Check HistoryDownloader paging, resume and dedup against a fake Alpaca client (no network)"""
+import shutil
+import tempfile
+from datetime import date, timedelta
+from bear.history import HistoryDownloader, ORDER_PAGE
+
+
+class FakeAlpaca:
+    """Serves bars in two pages per day and 1,200 orders per day (3 per timestamp, 2 symbols)"""
+
+    def __init__(self):
+        self.calls = {'bars': 0, 'orders': 0}
+        self.open_orders = set()  # Order ids still resting (status 'new')
+
+    def get_bars(self, symbol, start, end, page_token=None, limit=10000):
+        self.calls['bars'] += 1
+        day = start[:10]
+        page = int(page_token or 0)
+        bars = [{'t': f"{day}T{h:02d}:00:00Z", 'c': 1.0} for h in range(page * 12, page * 12 + 12)]
+        return bars, ('1' if page == 0 else None)
+
+    def get_orders(self, status='open', limit=500, after=None, until=None, direction='desc', symbols=None):
+        self.calls['orders'] += 1
+        day = until[:10]
+        orders = []
+        for i in range(1200):
+            ts = f"{day}T{i // 3 // 60:02d}:{i // 3 % 60:02d}:00.000000Z"
+            order_id = f"{day}-{i}"
+            orders.append({'id': order_id, 'submitted_at': ts,
+                           'status': 'new' if order_id in self.open_orders else 'filled',
+                           'symbol': 'BTC/USD' if i % 2 else 'ETH/USD', 'legs': None})
+        wanted = symbols.replace('USD', '/USD') if symbols else None
+        orders = [o for o in orders if o['submitted_at'] > after[:27]
+                  and (wanted is None or o['symbol'] == wanted)]
+        return orders[:limit]
+
+
+class ClockedDownloader(HistoryDownloader):
+    """Downloader whose idea of 'today' the test controls"""
+    current_day = date(2025, 1, 3)
+
+    def today(self):
+        return self.current_day
+
+
+if __name__ == '__main__':
+    cache = tempfile.mkdtemp()
+    fake = FakeAlpaca()
+    downloader = ClockedDownloader(cache, workers=2, rate_limit=60000, budget=1,
+                                   api_factory=lambda: fake)
+    try:
+        # Paging: two pages per day, 24 bars per day, days 1..3 (the 3rd is 'today')
+        stats = downloader.download('bars', 'BTCUSD', date(2025, 1, 1), date(2025, 1, 3))
+        assert stats['rows'] == 72 and fake.calls['bars'] == 6, stats
+        print("[OK] bars paged through next_page_token")
+
+        # Resume: closed days are skipped, the open day is fetched again
+        downloader.download('bars', 'BTCUSD', date(2025, 1, 1), date(2025, 1, 3))
+        assert fake.calls['bars'] == 8, fake.calls
+        print("[OK] rerun only refetched the still-open day")
+
+        # Rollover: yesterday's partial partition must not count as complete
+        ClockedDownloader.current_day += timedelta(days=1)
+        assert downloader.missing_days('bars', 'BTCUSD', date(2025, 1, 1), date(2025, 1, 3)) == [date(2025, 1, 3)]
+        downloader.download('bars', 'BTCUSD', date(2025, 1, 1), date(2025, 1, 3))
+        assert downloader.missing_days('bars', 'BTCUSD', date(2025, 1, 1), date(2025, 1, 3)) == []
+        print("[OK] day fetched while open was refetched after it closed")
+
+        # Dedup: merged partitions keep one row per key
+        df = downloader.load('bars', 'BTCUSD', date(2025, 1, 1), date(2025, 1, 3))
+        assert len(df) == 72 and df['t'].is_unique, len(df)
+        print("[OK] no duplicate bars after merges")
+
+        # Orders: pages end mid-timestamp and must not drop rows; only BTC/USD is stored
+        downloader.download('orders', 'BTCUSD', date(2025, 1, 1), date(2025, 1, 1))
+        orders = downloader.load('orders', 'BTCUSD', date(2025, 1, 1), date(2025, 1, 1))
+        assert len(orders) == 600 > ORDER_PAGE, len(orders)
+        assert orders['id'].is_unique and set(orders['symbol']) == {'BTC/USD'}
+        print("[OK] orders paged across shared timestamps and filtered by symbol")
+
+        # Orders: a day with a still-resting order stays open until it is done
+        fake.open_orders.add('2025-01-02-1')
+        downloader.download('orders', 'BTCUSD', date(2025, 1, 2), date(2025, 1, 2))
+        assert downloader.missing_days('orders', 'BTCUSD', date(2025, 1, 2), date(2025, 1, 2)) == [date(2025, 1, 2)]
+        fake.open_orders.clear()
+        downloader.download('orders', 'BTCUSD', date(2025, 1, 2), date(2025, 1, 2))
+        assert downloader.missing_days('orders', 'BTCUSD', date(2025, 1, 2), date(2025, 1, 2)) == []
+        orders = downloader.load('orders', 'BTCUSD', date(2025, 1, 2), date(2025, 1, 2))
+        assert len(orders) == 600 and set(orders['status']) == {'filled'}, orders['status'].value_counts()
+        print("[OK] orders day with a resting order refetched until it finished")
+
+        print("\nAll history checks passed")
+    finally:
+        shutil.rmtree(cache)
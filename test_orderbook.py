@@ -0,0 +1,50 @@
+"""Check OrderBook snapshot diffs, trimming and centering (no network)"""
+import random
+from bear.orderbook import OrderBook
+
+
+def random_snapshot(mid, levels=25):
+    bids = [(mid - 0.5 - i * 0.5, random.choice([1.0, 2.0, 3.0])) for i in range(levels)]
+    asks = [(mid + 0.5 + i * 0.5, random.choice([1.0, 2.0])) for i in range(levels)]
+    random.shuffle(bids)  # Order inside a snapshot must not matter
+    return bids, asks
+
+
+def sides(book):
+    return list(book.bid_px), list(book.bid_sz), list(book.ask_px), list(book.ask_sz)
+
+
+if __name__ == '__main__':
+    random.seed(7)
+
+    # Diffed snapshots end up exactly where a full rebuild would
+    diffed, rebuilt = OrderBook(max_depth=20), OrderBook(max_depth=20)
+    mid = 100.0
+    for t in range(2000):
+        mid += random.choice([-0.5, 0, 0.5])
+        bids, asks = random_snapshot(mid)
+        diffed.apply_snapshot(bids, asks, ts=t)
+        rebuilt.apply_update(bids, asks, reset=True, ts=t)
+        assert sides(diffed) == sides(rebuilt), t
+    assert len(diffed.bid_px) == len(diffed.ask_px) == 20
+    print("[OK] 2,000 diffed snapshots match full rebuilds, trimmed to max_depth")
+
+    # Only what moved is touched
+    book = OrderBook(max_depth=3)
+    book.apply_snapshot([(99, 1), (98, 1), (97, 1)], [(101, 1), (102, 1), (103, 1)])
+    changed = book.apply_snapshot([(99, 2), (98, 1), (97, 1)], [(101, 1), (102, 1), (103, 1)])
+    assert changed == 1 and book.bid_sz[-1] == 2
+    changed = book.apply_snapshot([(99, 2), (98, 1), (97, 1)], [(100.5, 1), (101, 1), (102, 1)])
+    assert changed == 2 and book.best_ask == 100.5 and list(book.ask_px) == [100.5, 101, 102]
+    print("[OK] unchanged levels are left alone")
+
+    # Top of book and centering
+    book = OrderBook(max_depth=1)
+    book.apply_snapshot([(100, 3)], [(102, 1)])
+    assert (book.best_bid, book.best_ask, book.mid) == (100, 102, 101)
+    assert book.microprice == 101.5  # Thin ask side: fair price leans toward it
+    assert book.center('bid') == 100 and book.center('mid') == 101
+    assert book.depth() == {'bids': [(100, 3)], 'asks': [(102, 1)]}
+    print("[OK] best bid/ask, mid, microprice and depth")
+
+    print("\nAll orderbook checks passed")